@@ -0,0 +1,717 @@
+"""
+Benchmarks of the program, run it from the root of the repository by:
+
+    python3 -m benchmarks.benchmark [name ...] [--save] [--threshold RATIO] [--baseline PATH]
+
+Each benchmark prints what it measured, and its numbers are compared with the baseline saved before,
+the run fails if any of them is slower or larger than the baseline by more than the threshold.
+Numbers depend on the machine, so no baseline is kept in the repository (baseline.json is ignored by git),
+save one of your own machine by --save before comparing with it, nothing is compared until then.
+
+Every benchmark works in a temporary config folder, your own caches are never touched.
+"""
+import argparse
+import calendar
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from multiprocessing import Pool
+from urllib.parse import parse_qs, urlparse
+
+import mhcalendar.holiday as holiday_index
+import mhcalendar.io as io
+from mhcalendar import importer, payroll
+from mhcalendar.job import Job
+from mhcalendar.store import ScheduleStore
+from mhcalendar.table import HolidayTable
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+
+def _use_config_dir(path):
+    io.CONFIG_DIR = path
+
+
+def _checkin_once(config_dir):
+    _use_config_dir(config_dir)
+    with io.Cache.lock():
+        schedule = io.Cache.restore_schedule()
+        day = schedule.month.next_day
+        day.checkin(1)
+        io.Cache.cache_day(schedule, day)
+
+
+def concurrent_checkin(processes=20, rounds=5):
+    """
+    Check in from many processes at the same time, and verify that none of the check-ins is lost.
+    """
+    elapsed = 0
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory() as config_dir:
+            _use_config_dir(config_dir)
+            io.Cache.cache_holidays([])
+            schedule = Schedule(Job(160, 8, 2000, 2), Month(2017, 10, []))
+            io.Cache.cache_schedule(schedule)
+
+            start = time.perf_counter()
+            with Pool(processes) as pool:
+                pool.map(_checkin_once, [config_dir] * processes, 1)
+            elapsed += time.perf_counter() - start
+
+            days = io.Cache.restore_schedule().month.days
+            checked = [day for day in days if day.is_past]
+            lost = processes - len(checked)
+            if lost or any(day.checkin_manhour != 1 for day in checked):
+                raise AssertionError("{0} of {1} check-ins are lost".format(lost, processes))
+    return "{0} processes x {1} rounds, no check-in lost, {2:.1f} ms/round".format(
+        processes, rounds, elapsed / rounds * 1000), {'round_ms': elapsed / rounds * 1000}
+
+
+class _ObjectDay:
+    """
+    Day with its own __dict__, as it was before days are stored by columns.
+    """
+
+    def __init__(self, date_, holiday=None, dayoff=False, schedule=0, checkin=0, overtime=0, past=False):
+        self.date = date_
+        self.holiday = holiday
+        self.is_dayoff = dayoff
+        self.scheduled_work_hours = schedule
+        self.checkin_manhour = checkin
+        self.overtime = overtime
+        self.is_past = past
+
+
+class _ObjectMonth:
+    """
+    Month holding lists of dates, Day objects and weeks, as it was before days are stored by columns.
+    """
+
+    def __init__(self, month: Month):
+        self.index = dict(month.index)
+        self.dates = month.dates
+        self.holidays = list(month.holidays)
+        self.days = [_ObjectDay(d.date, d.holiday, d.is_dayoff, d.scheduled_work_hours, d.checkin_manhour,
+                                d.overtime, d.is_past) for d in month.days]
+        days = {day.date: day for day in self.days}
+        self.weeks = [[days[d.date] for d in week] for week in month.weeks]
+
+
+def _history(keys):
+    """
+    :return: months of keys, with every workday checked in
+    """
+    for year, month in keys:
+        m = Month(year, month, [])
+        for day in m.days:
+            if not day.is_dayoff:
+                day.schedule(8.0)
+                day.checkin(8.5)
+        yield m
+
+
+def _traced_size(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def month_memory(workers=50, years=10):
+    """
+    Compare memory of months holding days by columns with months holding Day objects.
+    Months by columns are measured both before and after their Day views are created.
+    """
+    keys = [(2000 + y, m) for y in range(1, years + 1) for m in range(1, 13)] * workers
+    history = list(_history(keys))
+
+    def by_columns():
+        return [pickle.loads(pickle.dumps(m.columns)) for m in history]
+
+    def by_views():
+        months = [pickle.loads(pickle.dumps(m)) for m in history]
+        for m in months:
+            m.weeks
+        return months
+
+    def by_objects():
+        return [_ObjectMonth(m) for m in history]
+
+    columns, views, objects = _traced_size(by_columns), _traced_size(by_views), _traced_size(by_objects)
+    return "{0} months, columns {1:.1f} MB, months with views {2:.1f} MB, months with objects {3:.1f} MB".format(
+        len(keys), columns / 2 ** 20, views / 2 ** 20, objects / 2 ** 20), \
+        {'columns_mb': columns / 2 ** 20, 'views_mb': views / 2 ** 20}
+
+
+def _timesheet(path, rows, workers):
+    """
+    Write a timesheet of rows, every worker checks in day by day from 2000.
+    """
+    with open(path, 'w', newline='') as file:
+        file.write('worker,date,hours,dayoff\n')
+        count = 0
+        for year in range(2000, 2100):
+            for mon in range(1, 13):
+                for day in Month(year, mon, []).days:
+                    for worker in range(workers):
+                        if count >= rows:
+                            return
+                        file.write('w{0},{1},{2},{3}\n'.format(
+                            worker, day.date.isoformat(), 0 if day.is_dayoff else 8.5, int(day.is_dayoff)))
+                        count += 1
+
+
+def import_throughput(rows=1000000, workers=200):
+    """
+    Import a timesheet of many workers into their stores, and verify the totals of one month.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'timesheet.csv')
+        _timesheet(path, rows, workers)
+        for worker in range(workers):
+            store = ScheduleStore(os.path.join(root, 'w{}'.format(worker)))
+            store.save_head(Schedule(Job(160, 8, 2000, 2), Month(2000, 1, [])))
+
+        start = time.perf_counter()
+        with open(path, newline='') as file:
+            count = importer.import_timesheet(importer.read_csv(file), root)
+        elapsed = time.perf_counter() - start
+
+        month = ScheduleStore(os.path.join(root, 'w0')).load_month(2000, 1, [])
+        workdays = [day for day in month.days if not day.is_dayoff]
+        if month.past_count != len(month.days) or month.past_overtime != len(workdays) / 2:
+            raise AssertionError("Totals of imported month are wrong")
+    return "{0} rows of {1} workers, {2:.2f} s, {3:.0f} rows/s".format(count, workers, elapsed, count / elapsed), \
+        {'row_us': elapsed / count * 1000000}
+
+
+class _OldDrawer:
+    """
+    MHCalendarDrawer as it was before rendering into a string, printing the calendar piece by piece.
+    """
+
+    def __init__(self, width=14):
+        self.width = 12 if width < 12 else width
+        self.hr_line = '-' * (width + 1) * 7 + '-'
+
+    def __separate_line(self, week: str, end=''):
+        week = list(week)
+        distance_to_end = self.width * 7 + 8 - len(week)
+        week += list(' ' * distance_to_end)
+        week[::self.width + 1] = list('|' * 8)
+        return ''.join(week) + end
+
+    def __pipe(self, start, width, *texts, seperator='|', end=''):
+        elements = [' ' * start, seperator]
+        for t in texts:
+            lent = len(t)
+            if lent < width:
+                t += ' ' * (width - lent)
+            t += seperator
+            elements.append(t)
+        elements.append(end)
+        return ''.join(elements)
+
+    def __packup_week_schedule(self, week):
+        start_index = week[0].date.weekday() * (self.width + 1)
+        holidays = ['* Holiday *'.center(self.width) if day.holiday is not None else ' ' * self.width
+                    for day in week]
+        schedule_hours = ['Sched: {}'.format(day.scheduled_work_hours) if not day.is_dayoff else '-'
+                          for day in week]
+        overtime_hours = ['OT: {}'.format(day.overtime) if not day.is_dayoff else '-' for day in week]
+        checkin_hours = ['Checkin: {}'.format(day.checkin_manhour) if not day.is_dayoff else '-' for day in week]
+        dayoff = ['Dayoff: {}'.format('Yes' if day.is_dayoff else 'No') for day in week]
+        done = ['Done: {}'.format('Yes' if day.is_past else 'No') for day in week]
+        return [self.__separate_line(self.__pipe(start_index, self.width, *texts), '\n')
+                for texts in (holidays, schedule_hours, overtime_hours, checkin_hours, dayoff, done)]
+
+    def __decorate_today(self, month, week_line):
+        if month.today:
+            day = date.today().day
+            index = week_line.find(' ' + str(day) + ' ')
+            if index > 0:
+                week_line = list(week_line)
+                week_line[index - 1] = '['
+                week_line[index + (3 if day < 10 else 4)] = ']'
+                week_line = ''.join(week_line)
+        return week_line
+
+    def draw(self, schedule: Schedule):
+        cal = str(calendar.month(schedule.month.index['year'], schedule.month.index['month'], self.width))
+        cal_lines = [' ' + w for w in cal.splitlines() if w != '']
+        title = cal_lines.pop(0)
+        day_of_week = cal_lines.pop(0)
+
+        print('', title, self.hr_line, day_of_week, self.__separate_line(self.hr_line), sep='\n')
+        for i in range(len(cal_lines)):
+            print(self.__separate_line(self.__decorate_today(schedule.month, cal_lines[i])))
+            print(*self.__packup_week_schedule(schedule.month.weeks[i]), sep='', end='')
+            print(self.__separate_line(self.hr_line))
+        print('(Sched = Schedule, OT = Overtime)')
+        for holiday in schedule.month.holidays:
+            print('{year}.{month}.{day}  {name}'.format(year=holiday.year, month=holiday.month, day=holiday.day,
+                                                        name=holiday.name))
+        print('')
+        day = schedule.month.today
+        day_name = date.today().strftime('%A')
+        if day:
+            holiday = '** {} **'.format(day.holiday.name) if day.holiday else ''
+            checkin_or_dayoff = '\t Checkin: {}'.format(day.checkin_manhour) if not day.is_dayoff else '\t Day off'
+            print('Today:', str(day.date), day_name, holiday, '\t Schedule(OT):', day.scheduled_work_hours,
+                  '({})'.format(day.overtime), checkin_or_dayoff)
+        else:
+            print('today:', date.today(), day_name)
+        workdays = len(schedule.month.days) - len(schedule.dayoff_list)
+        print('Expecting:', 'Manhour/Workdays = {0}/{1}d'.format(schedule.job.required_manhour, workdays),
+              '\t Salary = {}'.format(schedule.job.required_manhour * schedule.job.hourly_pay))
+        print('For now:  ', 'Checkin manhour = {}'.format(schedule.checkin_manhour),
+              '\t Remaining manhour = {}'.format(schedule.manhour_remain),
+              '\t Overtime = {}'.format(schedule.overhours),
+              '\t Salary = {}'.format(schedule.checkin_manhour * dec_float(schedule.job.hourly_pay)))
+        if schedule.manhour_absence > 0:
+            print('These manhour can not be scheduled on this month:', schedule.manhour_absence)
+
+
+def render_calendars(count=500):
+    """
+    Render calendars of a team report by the drawer and by the drawer before it, verify that both of them
+    and draw() give the same output, and that text too long for a cell is cut instead of failing as before.
+    """
+    today = date.today()
+    schedules = []
+    for i in range(count):
+        year, mon = (today.year, today.month) if i == 0 else (2000 + i // 12 % 30, i % 12 + 1)
+        schedule = Schedule(Job(160, 8, 2000, 2), Month(year, mon, []))
+        for day in schedule.month.days[:i % 20]:
+            if not day.is_dayoff:
+                day.checkin(8.5)
+        schedule.schedule()
+        schedules.append(schedule)
+    drawer = io.MHCalendarDrawer()
+    old = _OldDrawer()
+
+    start = time.perf_counter()
+    rendered = [drawer.render(schedule) for schedule in schedules]
+    elapsed = time.perf_counter() - start
+
+    output = StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        for schedule in schedules:
+            old.draw(schedule)
+    elapsed_old = time.perf_counter() - start
+    if output.getvalue() != ''.join(rendered):
+        raise AssertionError("render() differs from the drawer before it")
+
+    output = StringIO()
+    with redirect_stdout(output):
+        for schedule in schedules:
+            drawer.draw(schedule)
+    if output.getvalue() != ''.join(rendered):
+        raise AssertionError("draw() differs from render()")
+
+    # overtime left by float arithmetic, longer than a cell, which the drawer before failed on,
+    # by ValueError if the row overflowed the calendar, or by pipes written over the text
+    overflow = schedules[1]
+    overflow.month.workdays_remain[-1].overtime = 0.9199999999999999
+    row_width = (drawer.width + 1) * 7 + 1
+    output = StringIO()
+    try:
+        with redirect_stdout(output):
+            old.draw(overflow)
+        if 'OT: 0.9199999999999999' in output.getvalue():
+            raise AssertionError("The drawer before was expected to fail on text too long for a cell")
+    except ValueError:
+        pass
+    lines = drawer.render(overflow).splitlines()
+    if '|OT: 0.9199999~|' not in ''.join(lines) or \
+            any(len(line) != row_width for line in lines if line.startswith('|')):
+        raise AssertionError("Text too long for a cell is not cut to the cell")
+    return "{0} calendars, {1:.3f} ms/calendar, {2:.3f} ms/calendar before".format(
+        count, elapsed / count * 1000, elapsed_old / count * 1000), {'calendar_ms': elapsed / count * 1000}
+
+
+def _per_call(func, items, repeat=3):
+    """
+    :return: best milliseconds per item of calling func on every item, among repeat rounds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(items) * 1000
+
+
+def _team(workers, years, holidays):
+    """
+    :return: Schedule of each worker and each month in years since 2001, with different jobs and check-ins
+    """
+    schedules = []
+    for worker in range(workers):
+        job = Job(140 + worker % 7 * 10, 7.5 + worker % 2 * 0.5, 2000, worker % 4 * 0.75)
+        for year in range(2001, 2001 + years):
+            for mon in range(1, 13):
+                schedule = Schedule(job, Month(year, mon, holidays))
+                for day in schedule.month.days[:(worker + mon) % 25]:
+                    if not day.is_dayoff:
+                        day.checkin(job.daily_work_hours + worker % 3 * 0.5)
+                schedules.append(schedule)
+    return schedules
+
+
+def month_init(years=20):
+    """
+    Create months of years, with holidays given as a list and from the holiday index.
+    """
+    holidays = holiday_index.JapaneseHolidays().holidays(2001, 2000 + years)
+    keys = [(year, mon) for year in range(2001, 2001 + years) for mon in range(1, 13)]
+    holiday_index.load(holidays)
+    try:
+        by_list = _per_call(lambda key: Month(key[0], key[1], holidays), keys)
+        by_index = _per_call(lambda key: Month(*key), keys)
+    finally:
+        holiday_index.invalidate()
+    return "{0} months, holidays by list {1:.3f} ms/month, by index {2:.3f} ms/month".format(
+        len(keys), by_list, by_index), {'by_list_ms': by_list, 'by_index_ms': by_index}
+
+
+def schedule_precisions(workers=20, years=5):
+    """
+    Schedule months of a team at several precisions.
+    """
+    schedules = _team(workers, years, [])
+    results = ['{0} schedules'.format(len(schedules))]
+    measured = {}
+    for precision in (1, 0.5, 0.25, 0):
+        elapsed = _per_call(lambda schedule: schedule.schedule(precision), schedules)
+        results.append('precision {0} {1:.3f} ms'.format(precision, elapsed))
+        measured['precision_{}_ms'.format(precision)] = elapsed
+    return ', '.join(results), measured
+
+
+def adjust(workers=20, years=5):
+    """
+    Take days off and switch them back to on duty, then schedule again.
+    """
+    schedules = _team(workers, years, [])
+
+    def adjust_one(schedule):
+        schedule.adjust(day_off=(26, 27, 28))
+        schedule.schedule()
+        schedule.adjust(day_off=(-26, -27, -28))
+        schedule.schedule()
+
+    with redirect_stdout(StringIO()):
+        elapsed = _per_call(adjust_one, schedules)
+    return "{0} schedules, {1:.3f} ms to take 3 days off and back".format(len(schedules), elapsed), \
+        {'adjust_ms': elapsed}
+
+
+def schedule_cache(rounds=200):
+    """
+    Write and read the schedule cache.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        _use_config_dir(config_dir)
+        schedules = _team(1, rounds // 12 + 1, [])[:rounds]
+        for schedule in schedules:
+            schedule.schedule()
+        cache = _per_call(io.Cache.cache_schedule, schedules)
+        restore = _per_call(lambda _: io.Cache.restore_schedule(), schedules)
+        def values(schedule):
+            return [(day.is_dayoff, day.is_past, day.scheduled_work_hours, day.checkin_manhour, day.overtime)
+                    for day in schedule.month.days]
+
+        if values(io.Cache.restore_schedule()) != values(schedules[-1]):
+            raise AssertionError("Restored schedule differs from the cached one")
+    return "cache_schedule {0:.3f} ms, restore_schedule {1:.3f} ms".format(cache, restore), \
+        {'cache_ms': cache, 'restore_ms': restore}
+
+
+def restore_holidays(years=100, rounds=20):
+    """
+    Read the holiday cache of many years.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        _use_config_dir(config_dir)
+        holidays = holiday_index.JapaneseHolidays().holidays(1951, 1950 + years)
+        io.Cache.cache_holidays(holidays)
+        elapsed = _per_call(lambda _: io.Cache.restore_holidays(), range(rounds))
+        if io.Cache.restore_holidays() != holidays:
+            raise AssertionError("Restored holidays differ from the cached ones")
+    return "{0} holidays of {1} years, {2:.3f} ms".format(len(holidays), years, elapsed), {'restore_ms': elapsed}
+
+
+def holiday_table(years=100, rounds=20):
+    """
+    Prepare holidays for a worker by loading holiday cache and by mapping holiday table,
+    and verify both of them give the same holidays and months.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        _use_config_dir(config_dir)
+        holidays = holiday_index.JapaneseHolidays().holidays(1951, 1950 + years)
+        io.Cache.cache_holidays(holidays)
+        path = io.Cache.holiday_table_path()
+        tables = []
+
+        def map_table(_):
+            tables.append(HolidayTable.open(path))
+            holiday_index.use_table(tables[-1])
+
+        try:
+            by_cache = _per_call(lambda _: holiday_index.load(io.Cache.restore_holidays()), range(rounds))
+            expected = [Month(year, mon) for year in range(1951, 1951 + years) for mon in range(1, 13)]
+            by_table = _per_call(map_table, range(rounds))
+            table = tables[-1]
+            if [table.holiday(holiday_index.date_of(h)) for h in holidays] != holidays:
+                raise AssertionError("Holidays of the table differ from the cached ones")
+            months = [Month(year, mon) for year in range(1951, 1951 + years) for mon in range(1, 13)]
+            if [(m.holidays, [d.is_dayoff for d in m.days]) for m in months] != \
+                    [(m.holidays, [d.is_dayoff for d in m.days]) for m in expected]:
+                raise AssertionError("Months of the table differ from the ones of holiday cache")
+            dates = [day.date for month in expected[:120] for day in month.days]
+            lookup = _per_call(table.is_holiday, dates)
+        finally:
+            holiday_index.invalidate()
+            for table in tables:
+                table.close()
+    return "{0} holidays of {1} years, load cache {2:.3f} ms, map table {3:.3f} ms, is_holiday {4:.2f} us".format(
+        len(holidays), years, by_cache, by_table, lookup * 1000), \
+        {'load_cache_ms': by_cache, 'map_table_ms': by_table, 'is_holiday_us': lookup * 1000}
+
+
+class _StubCalendarService(BaseHTTPRequestHandler):
+    """
+    Answer requests of CalendarService in the same CSV as calendar-service.net, with holidays computed offline.
+    The ETag of a response is its years, a request with the same ETag is answered by 304.
+    """
+    # how many requests to fail by 503 before answering
+    failures = 0
+    statuses = []
+
+    def do_GET(self):
+        cls = _StubCalendarService
+        if cls.failures > 0:
+            cls.failures -= 1
+            cls.statuses.append(503)
+            self.send_error(503)
+            return
+        query = parse_qs(urlparse(self.path).query)
+        start_year, end_year = int(query['start_year'][0]), int(query['end_year'][0])
+        etag = '"{0}-{1}"'.format(start_year, end_year)
+        if self.headers.get('If-None-Match') == etag:
+            cls.statuses.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        holidays = holiday_index.JapaneseHolidays().holidays(start_year, end_year)
+        lines = ['year,month,day,gengo,wareki_year,weekday,weekday_number,holiday_name']
+        lines.extend(','.join(holiday) for holiday in holidays)
+        body = '\n'.join(lines).encode('EUC-JP') + b'\n'
+        cls.statuses.append(200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=EUC-JP')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _stub_server():
+    """
+    :return: stub server serving in a thread, and url template of it
+    """
+    server = HTTPServer(('127.0.0.1', 0), _StubCalendarService)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:{0}/cal?start_year={{start_year}}&end_year={{end_year}}'.format(
+        server.server_port)
+
+
+def holiday_fetch(rounds=20, years=10):
+    """
+    Request holidays by CalendarService from a local stub server instead of calendar-service.net.
+    """
+    server, url = _stub_server()
+    try:
+        provider = holiday_index.CalendarService(url)
+        with redirect_stdout(StringIO()):
+            elapsed = _per_call(lambda _: provider.holidays(2001, 2000 + years), range(rounds))
+            holidays = provider.holidays(2001, 2000 + years)
+    finally:
+        server.shutdown()
+        server.server_close()
+    if holidays != holiday_index.JapaneseHolidays().holidays(2001, 2000 + years):
+        raise AssertionError("Holidays from the stub server differ from the offline ones")
+    return "{0} holidays of {1} years, {2:.3f} ms/request".format(len(holidays), years, elapsed), \
+        {'request_ms': elapsed}
+
+
+def payroll_report(workers=2000, months=3, teams=20):
+    """
+    Sum up stores of workers in a process pool, and verify the report equals the one summed up in process.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        _use_config_dir(config_dir)
+        io.Cache.cache_holidays(holiday_index.JapaneseHolidays().holidays(2017, 2017))
+        records = []
+        for worker in range(workers):
+            root = os.path.join(config_dir, 'w{}'.format(worker))
+            store = ScheduleStore(root)
+            store.save_head(Schedule(Job(140 + worker % 7 * 10, 8, 1500 + worker % 10 * 100, 2), Month(2017, 1)))
+            for mon in range(1, months + 1):
+                month = Month(2017, mon)
+                for day in month.days[:worker % 28]:
+                    if not day.is_dayoff:
+                        day.checkin(8 + worker % 5 * 0.25)
+                store.save_month(month)
+            records.append(('w{}'.format(worker), 't{}'.format(worker % teams), root))
+
+        start = time.perf_counter()
+        report = payroll.aggregate(records)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = payroll.aggregate(records, processes=1)
+        elapsed_in_process = time.perf_counter() - start
+    if (report.workers, report.teams, report.months) != (expected.workers, expected.teams, expected.months):
+        raise AssertionError("Report of the pool differs from the one summed up in process")
+    return "{0} workers x {1} months, pool {2:.2f} s, in process {3:.2f} s, total salary {4}".format(
+        workers, months, elapsed, elapsed_in_process, report.total.salary), \
+        {'pool_s': elapsed, 'in_process_s': elapsed_in_process}
+
+
+def holiday_revalidate(years=10):
+    """
+    Fetch holidays of years concurrently from a stub server failing the first requests,
+    then revalidate them, which should be answered by 304 only.
+    """
+    from mhcalendar.fetch import AsyncCalendarService
+    server, url = _stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            _use_config_dir(config_dir)
+            provider = AsyncCalendarService(url, timeout=2, backoff=0.01)
+            expected = holiday_index.JapaneseHolidays().holidays(2001, 2000 + years)
+            _StubCalendarService.failures = 3
+            with redirect_stdout(StringIO()):
+                start = time.perf_counter()
+                holiday_index.prefetch(2001, 2000 + years, provider)
+                fetch_elapsed = time.perf_counter() - start
+                fetched = io.Cache.restore_holidays()
+                del _StubCalendarService.statuses[:]
+                start = time.perf_counter()
+                revalidated = provider.holidays(2001, 2000 + years)
+                revalidate_elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+    if sorted(fetched) != sorted(expected) or sorted(revalidated) != sorted(expected):
+        raise AssertionError("Holidays from the stub server differ from the offline ones")
+    if set(_StubCalendarService.statuses) != {304}:
+        raise AssertionError("Revalidation is answered by {}".format(_StubCalendarService.statuses))
+    return "{0} years, fetch with 3 failures {1:.1f} ms, revalidate {2:.1f} ms".format(
+        years, fetch_elapsed * 1000, revalidate_elapsed * 1000), \
+        {'fetch_ms': fetch_elapsed * 1000, 'revalidate_ms': revalidate_elapsed * 1000}
+
+
+BENCHMARKS = {
+    'adjust': adjust,
+    'holiday_fetch': holiday_fetch,
+    'holiday_revalidate': holiday_revalidate,
+    'holiday_table': holiday_table,
+    'import_throughput': import_throughput,
+    'concurrent_checkin': concurrent_checkin,
+    'month_init': month_init,
+    'month_memory': month_memory,
+    'payroll_report': payroll_report,
+    'render_calendars': render_calendars,
+    'restore_holidays': restore_holidays,
+    'schedule_cache': schedule_cache,
+    'schedule_precisions': schedule_precisions,
+}
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# how much slower or larger than the baseline a number can be
+THRESHOLD = 0.25
+
+
+def compare(measured, baseline, threshold=THRESHOLD):
+    """
+    :param measured: dict of benchmark name to its numbers, each number is the lower the better
+    :param baseline: the same dict saved before
+    :return: list of (benchmark name, number name, baseline number, measured number) beyond the threshold
+    """
+    regressions = []
+    for name, numbers in sorted(measured.items()):
+        for key, value in sorted(numbers.items()):
+            expected = baseline.get(name, {}).get(key)
+            if expected is not None and value > expected * (1 + threshold):
+                regressions.append((name, key, expected, value))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks.benchmark')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help='benchmarks to run, default to all of them: ' + ', '.join(sorted(BENCHMARKS)))
+    parser.add_argument('--save', action='store_true', help='save numbers of this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='ratio a number can exceed the baseline by, default to {}'.format(THRESHOLD))
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file, default to ' + BASELINE_PATH)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error('unknown benchmarks: ' + ', '.join(unknown))
+
+    measured = {}
+    for name in args.names or sorted(BENCHMARKS):
+        result, measured[name] = BENCHMARKS[name]()
+        print('{0}: {1}'.format(name, result))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    if args.save:
+        baseline.update(measured)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print('Baseline saved: ' + args.baseline)
+        return 0
+    if not baseline:
+        print('No baseline to compare with, save one by --save.')
+        return 0
+
+    regressions = compare(measured, baseline, args.threshold)
+    for name, key, expected, value in regressions:
+        print('Regression of {0}.{1}: {2:.4g}, baseline {3:.4g} (+{4:.0%})'.format(
+            name, key, value, expected, value / expected - 1))
+    if regressions:
+        return 1
+    print('No regression beyond {0:.0%} of the baseline.'.format(args.threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Schedule a batch of jobs in one pass.
+"""
+from multiprocessing import Pool
+
+from mhcalendar.table import init_worker
+from mhcalendar.time_elements import Month, Schedule
+
+
+def _schedule_one(task):
+    job, month, precision = task
+    if not isinstance(month, Month):
+        month = Month(*month)
+    schedule = Schedule(job, month)
+    schedule.schedule(precision)
+    return schedule
+
+
+def schedule_all(records, precision=1, processes=None, chunksize=16):
+    """
+    Schedule every (Job, Month) pair of records in a process pool.
+    Holidays are looked up in holiday table, which is mapped by every worker instead of copied to each of them.
+
+    :param records: iterable of (Job, Month) pairs, month can also be given as (year, month) to create a new one
+    :param precision: same as Schedule.schedule()
+    :param processes: number of worker processes, default to the number of cores, 1 means no pool
+    :param chunksize: how many records to send to a worker at a time
+    :return: list of scheduled Schedule, in the same order as records
+    """
+    from mhcalendar.io import Cache
+    tasks = [(job, month, precision) for job, month in records]
+
+    if processes == 1:
+        # holidays are looked up in the index of this process as they are
+        return [_schedule_one(task) for task in tasks]
+
+    with Pool(processes, initializer=init_worker, initargs=(Cache.holiday_table_path(),)) as pool:
+        return pool.map(_schedule_one, tasks, chunksize)
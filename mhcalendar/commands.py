@@ -0,0 +1,98 @@
+"""
+Commands on a schedule, shared by the command line and the daemon.
+Each command prints its result, and leaves restoring and caching the schedule to the caller.
+"""
+from mhcalendar.io import Cache, MHCalendarDrawer
+from mhcalendar.job import Job
+from mhcalendar.time_elements import Month
+
+
+def check_schedule(schedule):
+    if not schedule:
+        raise Exception("Initialize error. Try again.")
+    if not schedule.job:
+        raise Exception("You haven't create your Job file yet.")
+    if not schedule.month.next_day:
+        raise Exception("This month's schedule is completed already.\nUpdate your Month data for next schedule.")
+
+
+def set_job(schedule, required_manhour, daily_work_hours, hourly_pay, max_daily_overhours):
+    schedule.job = Job(float(required_manhour), float(daily_work_hours), float(hourly_pay),
+                       float(max_daily_overhours))
+
+
+def show_job(schedule):
+    check_schedule(schedule)
+    print(schedule.job)
+
+
+def set_month(schedule, year, month):
+    """
+    Switch to another month, days of that month are restored if it has been processed before.
+    """
+    year, month = int(year), int(month)
+    schedule.month = Cache.schedule_store().load_month(year, month) or Month(year, month)
+
+
+def show_month(schedule):
+    print('Month: ', schedule.month.index['year'], '.', schedule.month.index['month'], sep='')
+
+
+def checkin(schedule, hours=None):
+    """
+    Check in the man hours into the date which is pointing to.
+
+    :param hours: default to the scheduled hours of that date
+    :return: the Day checked in
+    """
+    check_schedule(schedule)
+    day_to_checkin = schedule.month.next_day
+    if not day_to_checkin:
+        raise Exception()
+    if hours:
+        day_to_checkin.checkin(float(hours))
+    else:
+        day_to_checkin.checkin()
+    print("Date: {0}.{1}.{2} {3} \t Check in hours: {4}".format(day_to_checkin.date.year, day_to_checkin.date.month,
+                                                                day_to_checkin.date.day,
+                                                                day_to_checkin.date.strftime('%A'),
+                                                                day_to_checkin.checkin_manhour))
+    return day_to_checkin
+
+
+def dayoff(schedule, dates=()):
+    """
+    :param dates: see Schedule.adjust(), default to the date which is pointing to
+    """
+    check_schedule(schedule)
+    dates = [int(d) for d in dates]
+    if not dates or len(dates) == 0:
+        dates = [-schedule.month.next_day.date.day]
+    schedule.adjust(day_off=dates)
+
+
+def pointer(schedule):
+    check_schedule(schedule)
+    print(schedule.month.next_day)
+
+
+def calendar(schedule, precision=1):
+    """
+    Update the schedule under precision and draw the calendar.
+    """
+    check_schedule(schedule)
+    schedule.schedule(precision)
+    MHCalendarDrawer().draw(schedule)
+
+
+# name of command: if it changes the schedule
+COMMANDS = {
+    'set_job': True,
+    'show_job': False,
+    'set_month': True,
+    'show_month': False,
+    'checkin': True,
+    'dayoff': True,
+    'pointer': False,
+    'calendar': True,
+}
@@ -0,0 +1,161 @@
+"""
+Daemon to keep the schedule in memory and serve commands over a Unix domain socket.
+
+Each request and response is one line of JSON:
+
+    {"command": "checkin", "args": {"hours": 8}}
+    {"output": "Date: ...", "error": null}
+
+Changes are written back to cache after a short delay, so that a burst of changes is written only once.
+"""
+import json
+import os
+import socket
+
+SOCKET_NAME = 'mhcalendar.sock'
+# seconds to wait for more changes before writing the cache
+FLUSH_DELAY = 2
+# seconds to wait for the daemon's response
+TIMEOUT = 5
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path():
+    from mhcalendar.io import CONFIG_DIR
+    return os.path.join(CONFIG_DIR, SOCKET_NAME)
+
+
+def request(command, **args):
+    """
+    Send a command to the daemon if it is running.
+    Once connected, the daemon may be handling the command already, so it must not be run again by the caller,
+    a timeout or a bad response raises DaemonError instead of being taken as the daemon not running.
+
+    :return: dict of response, or None if the daemon is not running
+    """
+    path = socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(TIMEOUT)
+    try:
+        try:
+            client.connect(path)
+        except OSError:
+            # socket left by a daemon which is gone
+            return None
+        try:
+            client.sendall(json.dumps({'command': command, 'args': args}).encode() + b'\n')
+            with client.makefile('rb') as response:
+                return json.loads(response.readline().decode())
+        except (OSError, ValueError) as e:
+            raise DaemonError("Daemon is not answering, the command may have been done or not: {}".format(e))
+    finally:
+        client.close()
+
+
+def running():
+    """
+    :return: if the daemon is running, raise DaemonError if it is running but not answering
+    """
+    return request('show_month') is not None
+
+
+class Server:
+    def __init__(self, flush_delay=FLUSH_DELAY):
+        from mhcalendar import io
+        self.io = io
+        self.flush_delay = flush_delay
+        self.schedule = io.load_schedule()
+        self.loop = None
+        self.__flush_handle = None
+
+    def execute(self, command, args):
+        """
+        :return: dict of response
+        """
+        from contextlib import redirect_stdout
+        from io import StringIO
+        from mhcalendar import commands
+
+        output = StringIO()
+        error = None
+        try:
+            if command not in commands.COMMANDS:
+                raise Exception("Unknown command: {}".format(command))
+            with redirect_stdout(output):
+                getattr(commands, command)(self.schedule, **args)
+            if commands.COMMANDS[command]:
+                self.__schedule_flush()
+        except Exception as e:
+            error = str(e)
+        return {'output': output.getvalue(), 'error': error}
+
+    def __schedule_flush(self):
+        if self.__flush_handle is None:
+            self.__flush_handle = self.loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self):
+        """
+        Write the schedule in memory back to cache.
+        """
+        self.__flush_handle = None
+        with self.io.Cache.lock():
+            self.io.Cache.cache_schedule(self.schedule)
+
+    async def handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            req = json.loads(line.decode())
+            response = self.execute(req.get('command'), req.get('args') or {})
+        except ValueError:
+            response = {'output': '', 'error': "Bad request."}
+        writer.write(json.dumps(response).encode() + b'\n')
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def serve_forever(self):
+        import asyncio
+        import signal
+
+        path = socket_path()
+        if running():
+            raise Exception("Daemon is running already: {}".format(path))
+        if os.path.exists(path):
+            os.remove(path)
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_unix_server(self.handle, path))
+        try:
+            self.loop.add_signal_handler(signal.SIGTERM, self.loop.stop)
+        except NotImplementedError:
+            pass
+        print('Serving on', path)
+        try:
+            self.loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            self.loop.run_until_complete(server.wait_closed())
+            if self.__flush_handle is not None:
+                self.__flush_handle.cancel()
+                self.flush()
+            if os.path.exists(path):
+                os.remove(path)
+            self.loop.close()
+
+
+def serve(flush_delay=FLUSH_DELAY):
+    """
+    Run the daemon until it is interrupted or terminated.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise Exception("Daemon mode needs Unix domain socket, which is not supported on this platform.")
+    Server(flush_delay).serve_forever()
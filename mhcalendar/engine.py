@@ -0,0 +1,172 @@
+"""
+Fixed-point engine to distribute remaining man-hours over workdays,
+gives the same result as the per-day Decimal loop Schedule.schedule() ran before, see tests/test_engine.py.
+"""
+from decimal import Decimal
+
+# daily average is quantized to 0.01 hour as Schedule.schedule() does
+AVERAGE_PLACES = 2
+
+# the largest unit value NumPy can hold in int64
+INT64_MAX = 2 ** 63 - 1
+
+
+def _numpy():
+    """
+    Import NumPy at the first use, it takes longer than the whole startup of the CLI.
+
+    :return: numpy module, or None if it is not installed
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _places(*numbers):
+    """
+    :return: decimal places needed to represent all numbers exactly, at least AVERAGE_PLACES
+    """
+    places = AVERAGE_PLACES
+    for number in numbers:
+        exponent = Decimal(str(number)).as_tuple().exponent
+        if isinstance(exponent, int) and -exponent > places:
+            places = -exponent
+    return places
+
+
+def to_units(number, places):
+    """
+    Convert a number of hours to integer units of 10^-places hour.
+    """
+    return int(Decimal(str(number)).scaleb(places))
+
+
+def to_hours(units, places):
+    """
+    Convert integer units of 10^-places hour back to Decimal hours.
+    """
+    return Decimal(int(units)).scaleb(-places)
+
+
+def _distribute_units(remain, count, daily, cap, precision, step):
+    """
+    Integer version of the scheduling loop, every argument is in the same units.
+
+    :return: (list of scheduled units for each workday, units remaining)
+    """
+    hours = []
+    workdays_count = count
+    for _ in range(count):
+        if remain > daily:
+            # quantize remain / workdays_count to step with ROUND_HALF_EVEN
+            denominator = workdays_count * step
+            avg, rest = divmod(remain, denominator)
+            if rest * 2 > denominator or (rest * 2 == denominator and avg % 2):
+                avg += 1
+            avg *= step
+            workdays_count -= 1
+            if avg > daily:
+                schedule_hours = avg
+                if precision > 0 and avg % precision:
+                    schedule_hours = (avg // precision + 1) * precision
+                schedule_hours = cap if schedule_hours > cap else schedule_hours
+            else:
+                schedule_hours = daily
+        else:
+            schedule_hours = daily
+        hours.append(schedule_hours)
+        remain -= schedule_hours
+    return hours, remain
+
+
+def distribute_units(manhour_remain, workdays_count, daily_work_hours, max_daily_overhours, precision=1):
+    """
+    Same as distribute(), but give the result in integer units, to convert it only where it is stored.
+
+    :return: (list of scheduled units for each workday, units remaining, places of the units)
+    """
+    places = _places(manhour_remain, daily_work_hours, max_daily_overhours, precision)
+    daily = to_units(daily_work_hours, places)
+    cap = daily + to_units(max_daily_overhours, places)
+    hours, remain = _distribute_units(to_units(manhour_remain, places), workdays_count, daily, cap,
+                                      to_units(precision, places), 10 ** (places - AVERAGE_PLACES))
+    return hours, remain, places
+
+
+def distribute(manhour_remain, workdays_count, daily_work_hours, max_daily_overhours, precision=1):
+    """
+    Distribute manhour_remain over the remaining workdays in one pass.
+
+    :param manhour_remain: hours need to be scheduled
+    :param workdays_count: number of remaining workdays
+    :param daily_work_hours: same as Job.daily_work_hours
+    :param max_daily_overhours: same as Job.max_daily_overhours
+    :param precision: same as Schedule.schedule()
+    :return: (list of Decimal scheduled hours for each workday, Decimal hours remaining which may be minus)
+    """
+    hours, remain, places = distribute_units(manhour_remain, workdays_count, daily_work_hours,
+                                             max_daily_overhours, precision)
+    return [to_hours(h, places) for h in hours], to_hours(remain, places)
+
+
+def distribute_many(manhour_remains, workdays_counts, daily_work_hours, max_daily_overhours, precision=1):
+    """
+    Distribute many scenarios of the same job at once, vectorized by NumPy if it is installed.
+
+    :param manhour_remains: hours need to be scheduled of each scenario
+    :param workdays_counts: number of remaining workdays of each scenario
+    :return: (rows of Decimal scheduled hours, list of Decimal hours remaining), one for each scenario
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        places = _places(daily_work_hours, max_daily_overhours, precision, *manhour_remains)
+        step = 10 ** (places - AVERAGE_PLACES)
+        daily = to_units(daily_work_hours, places)
+        cap = daily + to_units(max_daily_overhours, places)
+        pre = to_units(precision, places)
+        remains = [to_units(r, places) for r in manhour_remains]
+        columns = max(workdays_counts, default=0)
+        # bound of every value the loop figures out, doubled for rest * 2
+        bound = (max(map(abs, remains), default=0) + (columns + 1) * (abs(cap) + abs(pre) + step)) * 2
+        if bound <= INT64_MAX:
+            return _distribute_many_by_numpy(numpy, remains, workdays_counts, places, step, daily, cap, pre)
+
+    # NumPy is not installed, or units of long decimals do not fit in int64
+    results = [distribute(remain, count, daily_work_hours, max_daily_overhours, precision)
+               for remain, count in zip(manhour_remains, workdays_counts)]
+    return [r[0] for r in results], [r[1] for r in results]
+
+
+def _distribute_many_by_numpy(numpy, remains, workdays_counts, places, step, daily, cap, pre):
+    """
+    Vectorized version of _distribute_units() over scenarios, every argument is in the same units.
+    """
+    remain = numpy.array(remains, dtype=numpy.int64)
+    counts = numpy.array(workdays_counts, dtype=numpy.int64)
+    workdays_count = counts.copy()
+    columns = int(counts.max()) if len(counts) else 0
+    hours = numpy.zeros((len(counts), columns), dtype=numpy.int64)
+
+    for i in range(columns):
+        scheduling = counts > i
+        averaging = scheduling & (remain > daily)
+        denominator = numpy.maximum(workdays_count * step, 1)
+        avg, rest = numpy.divmod(remain, denominator)
+        avg += (rest * 2 > denominator) | ((rest * 2 == denominator) & (avg % 2 == 1))
+        avg *= step
+        workdays_count -= averaging
+
+        schedule_hours = avg
+        if pre > 0:
+            schedule_hours = numpy.where(avg % pre != 0, (avg // pre + 1) * pre, avg)
+        schedule_hours = numpy.minimum(schedule_hours, cap)
+        schedule_hours = numpy.where(averaging & (avg > daily), schedule_hours, daily)
+        schedule_hours = numpy.where(scheduling, schedule_hours, 0)
+
+        hours[:, i] = schedule_hours
+        remain -= schedule_hours
+
+    rows = [[to_hours(h, places) for h in row[:count]] for row, count in zip(hours, counts)]
+    return rows, [to_hours(r, places) for r in remain]
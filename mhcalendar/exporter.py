@@ -0,0 +1,189 @@
+"""
+Export schedules and days as CSV, JSON Lines or columnar binary.
+
+Records are generated one by one, and written as they come,
+so exporting many workers or years never holds all of them in memory.
+
+Columnar binary file:
+
+    header  magic, version, number of fields, then name and type of each field
+    block   number of rows, then one column for each field, until a block of 0 rows
+
+Types of column: 'd' float64, '?' bool of 1 byte, 's' utf-8 text, each prefixed by its length.
+Decimal fields are written as text, so that salary stays exact.
+"""
+import csv
+import json
+import struct
+from array import array
+from decimal import Decimal
+from itertools import islice
+
+from mhcalendar.store import ScheduleStore
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+# name and type of each field, see columnar binary in module's doc
+DAY_FIELDS = (('worker', 's'), ('date', 's'), ('holiday', 's'), ('dayoff', '?'), ('past', '?'),
+              ('scheduled', 'd'), ('checkin', 'd'), ('overtime', 'd'), ('salary', 's'))
+SCHEDULE_FIELDS = (('worker', 's'), ('year', 'd'), ('month', 'd'), ('checkin_manhour', 's'),
+                   ('manhour_remain', 's'), ('overtime', 's'), ('manhour_absence', 'd'), ('salary', 's'))
+
+COLUMNS_MAGIC = b'MHCX'
+COLUMNS_VERSION = 1
+BLOCK_SIZE = 4096
+_COUNT = struct.Struct('<I')
+
+
+def day_records(month: Month, hourly_pay=0, worker=''):
+    """
+    :param hourly_pay: hourly pay of the job, to figure out salary of each day
+    :return: generator of dict for each day of the month
+    """
+    pay = dec_float(hourly_pay)
+    for day in month.days:
+        yield {
+            'worker': worker,
+            'date': day.date.isoformat(),
+            'holiday': day.holiday.name if day.holiday else '',
+            'dayoff': day.is_dayoff,
+            'past': day.is_past,
+            'scheduled': day.scheduled_work_hours,
+            'checkin': day.checkin_manhour,
+            'overtime': day.overtime,
+            'salary': dec_float(day.checkin_manhour) * pay,
+        }
+
+
+def schedule_record(schedule: Schedule, worker=''):
+    """
+    :return: dict of the schedule's totals, salary is figured out the same as the calendar shows
+    """
+    hourly_pay = schedule.job.hourly_pay if schedule.job else 0
+    return {
+        'worker': worker,
+        'year': schedule.month.index['year'],
+        'month': schedule.month.index['month'],
+        'checkin_manhour': schedule.checkin_manhour,
+        'manhour_remain': schedule.manhour_remain,
+        'overtime': schedule.overhours,
+        'manhour_absence': schedule.manhour_absence,
+        'salary': schedule.checkin_manhour * dec_float(hourly_pay),
+    }
+
+
+def store_day_records(store: ScheduleStore, worker='', holidays=None):
+    """
+    Load months of the store one at a time.
+
+    :return: generator of dict for each day of every month in the store
+    """
+    job = store.load_job()
+    hourly_pay = job.hourly_pay if job else 0
+    for year, month in store.months():
+        yield from day_records(store.load_month(year, month, holidays), hourly_pay, worker)
+
+
+def _text(value):
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def write_csv(records, file, fields=DAY_FIELDS):
+    """
+    :param file: text file object opened with newline=''
+    :return: number of records written
+    """
+    writer = csv.writer(file)
+    names = [name for name, _ in fields]
+    writer.writerow(names)
+    count = 0
+    for record in records:
+        writer.writerow([_text(record[name]) for name in names])
+        count += 1
+    return count
+
+
+def write_jsonl(records, file, fields=DAY_FIELDS):
+    """
+    :param file: text file object
+    :return: number of records written
+    """
+    names = [name for name, _ in fields]
+    count = 0
+    for record in records:
+        file.write(json.dumps({name: _text(record[name]) for name in names}, ensure_ascii=False))
+        file.write('\n')
+        count += 1
+    return count
+
+
+def _pack_column(type_, values):
+    if type_ == 'd':
+        return array('d', (float(v) for v in values)).tobytes()
+    if type_ == '?':
+        return bytes(bool(v) for v in values)
+    texts = [str(v).encode('utf-8') for v in values]
+    return array('I', (len(t) for t in texts)).tobytes() + b''.join(texts)
+
+
+def _read_column(type_, file, count):
+    if type_ == 'd':
+        values = array('d')
+        values.frombytes(file.read(8 * count))
+        return values.tolist()
+    if type_ == '?':
+        return [bool(b) for b in file.read(count)]
+    lengths = array('I')
+    lengths.frombytes(file.read(4 * count))
+    buffer = file.read(sum(lengths))
+    values = []
+    offset = 0
+    for length in lengths:
+        values.append(buffer[offset:offset + length].decode('utf-8'))
+        offset += length
+    return values
+
+
+def write_columns(records, file, fields=DAY_FIELDS, block_size=BLOCK_SIZE):
+    """
+    :param file: binary file object
+    :param block_size: how many records to hold in memory and write as a block
+    :return: number of records written
+    """
+    header = [COLUMNS_MAGIC, struct.pack('<HH', COLUMNS_VERSION, len(fields))]
+    for name, type_ in fields:
+        encoded = name.encode('utf-8')
+        header.append(struct.pack('<B', len(encoded)) + encoded + type_.encode('ascii'))
+    file.write(b''.join(header))
+
+    count = 0
+    records = iter(records)
+    while True:
+        block = list(islice(records, block_size))
+        file.write(_COUNT.pack(len(block)))
+        if not block:
+            return count
+        file.write(b''.join(_pack_column(type_, [record[name] for record in block]) for name, type_ in fields))
+        count += len(block)
+
+
+def read_columns(file):
+    """
+    :param file: binary file object written by write_columns()
+    :return: generator of dict for each record, Decimal fields are given as text
+    """
+    magic, version, field_count = struct.unpack('<4sHH', file.read(8))
+    if magic != COLUMNS_MAGIC or version != COLUMNS_VERSION:
+        raise ValueError("Not a columnar export of version {}".format(COLUMNS_VERSION))
+    fields = []
+    for _ in range(field_count):
+        length = file.read(1)[0]
+        fields.append((file.read(length).decode('utf-8'), file.read(1).decode('ascii')))
+
+    names = [name for name, _ in fields]
+    while True:
+        count = _COUNT.unpack(file.read(_COUNT.size))[0]
+        if not count:
+            return
+        columns = [_read_column(type_, file, count) for _, type_ in fields]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
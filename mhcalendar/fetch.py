@@ -0,0 +1,199 @@
+"""
+Fetch holidays of many years concurrently, with timeout, retry and revalidation by ETag and Last-Modified.
+
+Each year is requested alone, so that a year not modified is answered by 304 without a body,
+and its holidays are taken from holiday cache.
+
+Revalidate holiday cache in a detached process, without waiting for the network:
+
+    python3 -m mhcalendar.fetch <start_year> <end_year> [<config_dir> [<url>]]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import mhcalendar.io as io
+from mhcalendar.holiday import CalendarService, prefetch
+from mhcalendar.log import event, span
+
+# seconds before the validators of holiday cache are checked again
+MAX_AGE = 24 * 60 * 60
+# seconds before a revalidation which has not succeeded is started again
+RETRY_AFTER = 10 * 60
+
+
+class AsyncCalendarService(CalendarService):
+    """
+    Request holidays from http://calendar-service.net/, one request for each year, all at the same time.
+    """
+
+    def __init__(self, url=CalendarService.URL, timeout=5, retries=3, backoff=0.5, concurrency=4):
+        """
+        :param timeout: seconds to wait for each request
+        :param retries: how many times to retry a request failed by network or server error
+        :param backoff: seconds to wait before the first retry, doubled for each retry after it
+        :param concurrency: how many requests at the same time
+        """
+        super().__init__(url, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.concurrency = concurrency
+
+    def _request(self, url, validator):
+        """
+        :return: (status, body, validator of the response)
+        """
+        from urllib import error, request
+        headers = {}
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('last_modified'):
+            headers['If-Modified-Since'] = validator['last_modified']
+        try:
+            with request.urlopen(request.Request(url, headers=headers), timeout=self.timeout) as response:
+                return response.status, response.read(), {'etag': response.headers.get('ETag'),
+                                                          'last_modified': response.headers.get('Last-Modified')}
+        except error.HTTPError as e:
+            if e.code == 304:
+                return 304, b'', validator
+            raise
+
+    async def _fetch_year(self, semaphore, year, validator):
+        """
+        :return: (year, status, body, validator), status is None if all tries failed
+        """
+        from urllib import error
+        url = self.url.format(start_year=year, end_year=year)
+        loop = asyncio.get_event_loop()
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    with span('holiday.fetch', url=url, attempt=attempt) as s:
+                        status, body, validator = await asyncio.wait_for(
+                            loop.run_in_executor(None, self._request, url, validator), self.timeout + 1)
+                        s.set(status=status)
+                return year, status, body, validator
+            except error.HTTPError as e:
+                if e.code < 500:
+                    return year, None, b'', validator
+            except (error.URLError, OSError, asyncio.TimeoutError):
+                pass
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return year, None, b'', validator
+
+    async def _fetch(self, years, validators):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        urls = {year: self.url.format(start_year=year, end_year=year) for year in years}
+        return await asyncio.gather(*(self._fetch_year(semaphore, year, validators.get(urls[year], {}))
+                                      for year in years))
+
+    def holidays(self, start_year, end_year):
+        """
+        :return: Holiday list of the years fetched or not modified, or None if all of them failed
+        """
+        print('Accessing network to request holiday data...')
+        years = list(range(start_year, end_year + 1))
+        cached = io.Cache.restore_holidays() or []
+        cached_years = {int(h.year) for h in cached}
+        validators = io.Cache.restore_validators()
+        # only years in cache can be answered by 304
+        sent = {}
+        for year in years:
+            url = self.url.format(start_year=year, end_year=year)
+            if year in cached_years and url in validators:
+                sent[url] = validators[url]
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(self._fetch(years, sent))
+        finally:
+            loop.close()
+
+        holidays = []
+        checked = {}
+        for year, status, body, validator in results:
+            url = self.url.format(start_year=year, end_year=year)
+            if status == 304:
+                holidays.extend(h for h in cached if int(h.year) == year)
+            elif status == 200:
+                try:
+                    holidays.extend(self.parse(body))
+                except (UnicodeDecodeError, TypeError):
+                    # a broken body fails the year, its holidays in cache are kept as they are
+                    event('holiday.parse_failure', url=url)
+                    continue
+            else:
+                continue
+            checked[url] = dict(validator, checked=time.time())
+        if not checked:
+            print("Holiday schedule request failure.")
+            return None
+        with io.Cache.lock():
+            validators = io.Cache.restore_validators()
+            validators.update(checked)
+            io.Cache.cache_validators(validators)
+        print('Success.')
+        return holidays
+
+
+def is_stale(start_year, end_year, url=CalendarService.URL, max_age=MAX_AGE, retry_after=RETRY_AFTER):
+    """
+    :return: if any year has been neither checked in max_age seconds nor attempted in retry_after seconds
+    """
+    validators = io.Cache.restore_validators()
+    now = time.time()
+    for year in range(start_year, end_year + 1):
+        validator = validators.get(url.format(start_year=year, end_year=year), {})
+        if now - validator.get('checked', 0) > max_age and now - validator.get('attempted', 0) > retry_after:
+            return True
+    return False
+
+
+def _attempt(start_year, end_year, url):
+    """
+    Record the time a revalidation of the years is started, so that it is not started again by every call
+    while the network is down, see is_stale().
+    """
+    validators = io.Cache.restore_validators()
+    now = time.time()
+    for year in range(start_year, end_year + 1):
+        key = url.format(start_year=year, end_year=year)
+        validators[key] = dict(validators.get(key, {}), attempted=now)
+    io.Cache.cache_validators(validators)
+
+
+def revalidate(start_year, end_year, provider: AsyncCalendarService = None, max_age=MAX_AGE):
+    """
+    Stale-while-revalidate holiday cache, the cache in hand is used at once,
+    and stale years are revalidated in a detached process, so you never wait for the network.
+    Years not cached at all are computed offline meanwhile, see mhcalendar.holiday.holidays_of_year(),
+    and fetched by the same process.
+
+    :param provider: request holidays of the url by it, default to AsyncCalendarService()
+    :return: True if a process is started to revalidate
+    """
+    provider = provider or AsyncCalendarService()
+    with io.Cache.lock():
+        if not is_stale(start_year, end_year, provider.url, max_age):
+            return False
+        _attempt(start_year, end_year, provider.url)
+    subprocess.Popen([sys.executable, '-m', 'mhcalendar.fetch', str(start_year), str(end_year), io.CONFIG_DIR,
+                      provider.url],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    event('holiday.revalidate', start_year=start_year, end_year=end_year)
+    return True
+
+
+def main(argv):
+    start_year, end_year = int(argv[0]), int(argv[1])
+    if len(argv) > 2:
+        io.CONFIG_DIR = argv[2]
+    provider = AsyncCalendarService(*argv[3:4])
+    prefetch(start_year, end_year, provider)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
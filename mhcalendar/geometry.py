@@ -0,0 +1,41 @@
+"""
+Layout of the days of a month in week rows, computed once for each month and shared in the process.
+"""
+import calendar
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+# weeks: tuple of rows, each is a tuple of indexes of days in the row, first and last row may be shorter
+# cells: (row, column) of each day, column 0 is firstweekday
+MonthGeometry = namedtuple('MonthGeometry', ('year', 'month', 'firstweekday', 'weeks', 'cells'))
+
+# header of the month's text calendar
+MonthText = namedtuple('MonthText', ('title', 'day_of_week', 'weeks'))
+
+
+@lru_cache(maxsize=1024)
+def geometry(year, month, firstweekday=0):
+    """
+    :param firstweekday: weekday of the first column, 0 is Monday
+    :return: MonthGeometry
+    """
+    first_column = (date(year, month, 1).weekday() - firstweekday) % 7
+    cells = tuple(divmod(first_column + i, 7) for i in range(calendar.monthrange(year, month)[1]))
+    weeks = [[] for _ in range(cells[-1][0] + 1)]
+    for i, (row, _) in enumerate(cells):
+        weeks[row].append(i)
+    return MonthGeometry(year, month, firstweekday, tuple(tuple(week) for week in weeks), cells)
+
+
+@lru_cache(maxsize=1024)
+def text(year, month, width, firstweekday=0):
+    """
+    Lines of calendar.month(), split into title, day of week and week rows.
+
+    :param width: width of each day's column
+    :return: MonthText
+    """
+    lines = [line for line in calendar.TextCalendar(firstweekday).formatmonth(year, month, width).splitlines()
+             if line != '']
+    return MonthText(lines[0], lines[1], tuple(lines[2:]))
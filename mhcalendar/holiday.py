@@ -0,0 +1,367 @@
+"""
+Process-wide index of holidays, shared by every Month and Day, and the providers of holidays.
+"""
+from collections import namedtuple
+from datetime import date, timedelta
+from functools import lru_cache
+
+from mhcalendar.log import span
+
+Holiday = namedtuple('Holiday',
+                     ('year', 'month', 'day', 'year_name', 'year_count', 'weekday', 'weekday_number', 'name'))
+
+# how many years of holidays to keep indexed
+INDEX_YEARS = 8
+
+# holidays grouped by year (str), loaded from holiday cache at the first lookup
+_holidays_by_year = None
+
+# HolidayTable to look up instead of _holidays_by_year, see use_table()
+_table = None
+
+
+def _source():
+    global _holidays_by_year
+    if _holidays_by_year is None:
+        from mhcalendar.io import Cache
+        load(Cache.restore_holidays() or [])
+    return _holidays_by_year
+
+
+def load(holidays):
+    """
+    Replace holidays of the index, instead of loading them from holiday cache.
+
+    :param holidays: Holiday list of any years
+    """
+    global _holidays_by_year, _table
+    by_year = {}
+    for holiday in holidays:
+        by_year.setdefault(holiday.year, []).append(holiday)
+    _holidays_by_year = by_year
+    _table = None
+    holidays_of_year.cache_clear()
+    holidays_of_month.cache_clear()
+
+
+def use_table(table):
+    """
+    Look up holidays in a HolidayTable instead, such as one mapped from file by each worker process,
+    so that holidays are neither pickled to the workers nor loaded from holiday cache by each of them.
+
+    :param table: mhcalendar.table.HolidayTable
+    """
+    global _holidays_by_year, _table
+    _holidays_by_year = None
+    _table = table
+    holidays_of_year.cache_clear()
+    holidays_of_month.cache_clear()
+
+
+def invalidate():
+    """
+    Drop the index, holidays will be loaded from holiday cache again at the next lookup.
+    """
+    global _holidays_by_year, _table
+    _holidays_by_year = None
+    _table = None
+    holidays_of_year.cache_clear()
+    holidays_of_month.cache_clear()
+
+
+def date_of(holiday):
+    return date(int(holiday.year), int(holiday.month), int(holiday.day))
+
+
+def index_by_date(holidays):
+    """
+    :return: dict of date to Holiday
+    """
+    return {date_of(holiday): holiday for holiday in holidays}
+
+
+@lru_cache(maxsize=INDEX_YEARS)
+def holidays_of_year(year):
+    """
+    :return: dict of date to Holiday in that year,
+             computed by JapaneseHolidays if the year is not in holiday cache, see has_year()
+    """
+    if not has_year(year):
+        return index_by_date(_offline(year))
+    if _table is not None:
+        return index_by_date(_table.holidays_of_year(year))
+    return index_by_date(_source().get(str(year), ()))
+
+
+def _offline(year):
+    """
+    :return: Holiday list of the year computed by JapaneseHolidays, empty if the year is out of its range
+    """
+    if not JapaneseHolidays.FIRST_YEAR <= year <= JapaneseHolidays.LAST_YEAR:
+        return []
+    return JapaneseHolidays().holidays(year, year)
+
+
+@lru_cache(maxsize=INDEX_YEARS * 12)
+def holidays_of_month(year, month):
+    """
+    :return: dict of date to Holiday in that month, see holidays_of_year().
+             A holiday table is read directly, only the holidays of that month are created from it.
+    """
+    if _table is not None and _table.has_year(year):
+        return index_by_date(_table.holidays_of_month(year, month))
+    return {date_: holiday for date_, holiday in holidays_of_year(year).items() if date_.month == month}
+
+
+def lookup(date_: date):
+    """
+    :return: Holiday of that date or None
+    """
+    if _table is not None and _table.has_year(date_.year):
+        # the bit mask of the month is checked first, a Holiday is only created for a holiday
+        return _table.holiday(date_)
+    return holidays_of_year(date_.year).get(date_)
+
+
+def has_year(year):
+    """
+    :return: if holidays of that year are known
+    """
+    if _table is not None:
+        return _table.has_year(year)
+    return str(year) in _source()
+
+
+def merge_years(holidays, updates):
+    """
+    Replace holidays of the years which appear in updates.
+
+    :return: Holiday list sorted by date
+    """
+    years = set(holiday.year for holiday in updates)
+    merged = [holiday for holiday in holidays if holiday.year not in years] + list(updates)
+    return sorted(merged, key=date_of)
+
+
+class HolidayProvider:
+    """
+    Source of holidays.
+    """
+
+    def holidays(self, start_year, end_year):
+        """
+        :return: Holiday list from start_year to end_year (inclusive) sorted by date, or None for failure
+        """
+        raise NotImplementedError
+
+
+class JapaneseHolidays(HolidayProvider):
+    """
+    Compute Japanese holidays by the rules of the National Holiday Law, no network is needed.
+    Supports the years from 1949 to 2150.
+    """
+    FIRST_YEAR = 1949
+    LAST_YEAR = 2150
+
+    # era and the date it starts, latest first
+    ERAS = ((date(2019, 5, 1), '令和'), (date(1989, 1, 8), '平成'), (date(1926, 12, 25), '昭和'))
+    WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+    # holidays held only once
+    SPECIALS = {
+        date(1959, 4, 10): '皇太子明仁親王の結婚の儀',
+        date(1989, 2, 24): '昭和天皇の大喪の礼',
+        date(1990, 11, 12): '即位礼正殿の儀',
+        date(1993, 6, 9): '皇太子徳仁親王の結婚の儀',
+        date(2019, 5, 1): '天皇の即位の日',
+        date(2019, 10, 22): '即位礼正殿の儀',
+    }
+
+    # holidays moved for Tokyo Olympics
+    OLYMPIC_YEARS = {
+        2020: {'海の日': date(2020, 7, 23), 'スポーツの日': date(2020, 7, 24), '山の日': date(2020, 8, 10)},
+        2021: {'海の日': date(2021, 7, 22), 'スポーツの日': date(2021, 7, 23), '山の日': date(2021, 8, 8)},
+    }
+
+    def holidays(self, start_year, end_year):
+        if start_year < JapaneseHolidays.FIRST_YEAR or end_year > JapaneseHolidays.LAST_YEAR:
+            raise ValueError("Years out of range {0}-{1}: {2}-{3}".format(
+                JapaneseHolidays.FIRST_YEAR, JapaneseHolidays.LAST_YEAR, start_year, end_year))
+        holidays = []
+        for year in range(start_year, end_year + 1):
+            holidays.extend(self.__to_holiday(d, name) for d, name in sorted(self.holidays_of_year(year).items()))
+        return holidays
+
+    @classmethod
+    def __to_holiday(cls, date_, name):
+        for start, era in JapaneseHolidays.ERAS:
+            if date_ >= start:
+                year_name, year_count = era, date_.year - start.year + 1
+                break
+        else:
+            year_name, year_count = '', date_.year
+        # weekday_number counts from 0 as Sunday
+        return Holiday(str(date_.year), str(date_.month), str(date_.day), year_name, str(year_count),
+                       JapaneseHolidays.WEEKDAYS[date_.weekday()], str((date_.weekday() + 1) % 7), name)
+
+    @classmethod
+    def holidays_of_year(cls, year):
+        """
+        :return: dict of date to holiday name
+        """
+        national = cls.__national_holidays(year)
+        holidays = dict(national)
+
+        # a day between two national holidays is a holiday since 1986
+        if year >= 1986:
+            for d in national:
+                between = d + timedelta(days=1)
+                if between not in national and between + timedelta(days=1) in national \
+                        and between.weekday() != 6:
+                    holidays[between] = '国民の休日'
+
+        # national holiday on Sunday is substituted since 1973.4.12
+        for d in sorted(national):
+            if d.weekday() == 6 and d >= date(1973, 4, 12):
+                substitute = d + timedelta(days=1)
+                if year >= 2007:
+                    while substitute in holidays:
+                        substitute += timedelta(days=1)
+                if substitute not in holidays and substitute.year == year:
+                    holidays[substitute] = '振替休日'
+        return holidays
+
+    @classmethod
+    def __national_holidays(cls, year):
+        holidays = {}
+
+        def add(month, day, name):
+            holidays[date(year, month, day)] = name
+
+        add(1, 1, '元日')
+        if year >= 2000:
+            add(1, cls.__nth_monday(year, 1, 2), '成人の日')
+        else:
+            add(1, 15, '成人の日')
+        if year >= 1967:
+            add(2, 11, '建国記念の日')
+        if year >= 2020:
+            add(2, 23, '天皇誕生日')
+        add(3, cls.__equinox(year, 20.8357, 20.8431, 21.8510), '春分の日')
+        if year >= 2007:
+            add(4, 29, '昭和の日')
+        elif year >= 1989:
+            add(4, 29, 'みどりの日')
+        else:
+            add(4, 29, '天皇誕生日')
+        add(5, 3, '憲法記念日')
+        if year >= 2007:
+            add(5, 4, 'みどりの日')
+        add(5, 5, 'こどもの日')
+        if year >= 2003:
+            add(7, cls.__nth_monday(year, 7, 3), '海の日')
+        elif year >= 1996:
+            add(7, 20, '海の日')
+        if year >= 2016:
+            add(8, 11, '山の日')
+        if year >= 2003:
+            add(9, cls.__nth_monday(year, 9, 3), '敬老の日')
+        elif year >= 1966:
+            add(9, 15, '敬老の日')
+        add(9, cls.__equinox(year, 23.2588, 23.2488, 24.2488), '秋分の日')
+        if year >= 2022:
+            add(10, cls.__nth_monday(year, 10, 2), 'スポーツの日')
+        elif 2000 <= year <= 2019:
+            add(10, cls.__nth_monday(year, 10, 2), '体育の日')
+        elif 1966 <= year <= 1999:
+            add(10, 10, '体育の日')
+        add(11, 3, '文化の日')
+        add(11, 23, '勤労感謝の日')
+        if 1989 <= year <= 2018:
+            add(12, 23, '天皇誕生日')
+
+        moved = cls.OLYMPIC_YEARS.get(year, {})
+        for d, name in list(holidays.items()):
+            if name in moved:
+                del holidays[d]
+        for name, d in moved.items():
+            holidays[d] = name
+
+        holidays.update((d, name) for d, name in cls.SPECIALS.items() if d.year == year)
+        return holidays
+
+    @classmethod
+    def __nth_monday(cls, year, month, nth):
+        first = date(year, month, 1)
+        return 1 + (7 - first.weekday()) % 7 + (nth - 1) * 7
+
+    @classmethod
+    def __equinox(cls, year, base_before_1980, base_before_2100, base_after_2100):
+        """
+        :return: day of the vernal or autumnal equinox by the approximate formula
+        """
+        if year < 1980:
+            return int(base_before_1980 + 0.242194 * (year - 1980) - int((year - 1983) / 4))
+        base = base_before_2100 if year < 2100 else base_after_2100
+        return int(base + 0.242194 * (year - 1980) - int((year - 1980) / 4))
+
+
+class CalendarService(HolidayProvider):
+    """
+    Request holidays from http://calendar-service.net/
+    """
+    URL = "http://calendar-service.net/cal?start_year={start_year}&start_mon=1&end_year={end_year}&end_mon=12\
+&year_style=normal&month_style=numeric&wday_style=en&format=csv&holiday_only=1"
+
+    def __init__(self, url=URL, timeout=10):
+        """
+        :param url: url template with {start_year} and {end_year}, replace it to request a mirror or stub server
+        :param timeout: seconds to wait for the server
+        """
+        self.url = url
+        self.timeout = timeout
+
+    @staticmethod
+    def parse(content: bytes):
+        """
+        :param content: CSV response of calendar-service.net
+        :return: Holiday list
+        """
+        lines = [line for line in content.decode('EUC-JP').split('\n') if line != '']
+        return [Holiday(*line.split(',')) for line in lines[1:]]
+
+    def holidays(self, start_year, end_year):
+        from urllib import request
+        url = self.url.format(start_year=start_year, end_year=end_year)
+        print('Accessing network to request holiday data...')
+        print('url: ' + url)
+
+        with span('holiday.fetch', url=url) as s:
+            try:
+                with request.urlopen(url, timeout=self.timeout) as f:
+                    holidays = self.parse(f.read())
+                    print('Success.')
+                    s.set(count=len(holidays))
+                    return holidays
+            except:
+                print("Holiday schedule request failure.")
+                s.set(error='request failure')
+                return None
+
+
+def prefetch(start_year, end_year, provider: HolidayProvider = None):
+    """
+    Fill holiday cache with holidays of the years from start_year to end_year (inclusive) in one call.
+    Holidays are fetched without the lock of config folder, which is only held to merge them into holiday cache,
+    so that other processes are not blocked while waiting for the network.
+
+    :param provider: default to JapaneseHolidays
+    :return: Holiday list fetched, or None for failure
+    """
+    from mhcalendar.io import Cache
+    with span('holiday.prefetch', start_year=start_year, end_year=end_year):
+        holidays = (provider or JapaneseHolidays()).holidays(start_year, end_year)
+        if holidays is not None:
+            with Cache.lock():
+                Cache.cache_holidays(merge_years(Cache.restore_holidays() or [], holidays))
+    return holidays
@@ -0,0 +1,161 @@
+"""
+Import timesheets of history into schedule stores.
+
+A timesheet is a CSV file with header, or a JSON Lines file, each row has these fields:
+
+    date      date of the day, as YYYY-MM-DD
+    hours     man hours checked in, ignored for day off
+    dayoff    optional, 1 or true for a day off
+    worker    optional, name of the worker, see import_timesheet()
+"""
+import csv
+import json
+import os
+from datetime import date
+from itertools import islice
+
+from mhcalendar.store import ScheduleStore
+
+CHUNK_SIZE = 10000
+
+
+def read_csv(file):
+    """
+    :param file: text file object
+    :return: generator of rows as dict
+    """
+    return csv.DictReader(file)
+
+
+def read_jsonl(file):
+    """
+    :param file: text file object
+    :return: generator of rows as dict
+    """
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _parse_date(text):
+    return date(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+class _Worker:
+    """
+    Months of one worker being imported.
+    """
+
+    def __init__(self, store: ScheduleStore):
+        self.store = store
+        job = store.load_job()
+        self.daily_work_hours = job.daily_work_hours if job else 0
+        self.months = {}
+
+    def month(self, year, month):
+        key = (year, month)
+        result = self.months.get(key)
+        if result is None:
+            from mhcalendar.time_elements import Month
+            result = self.store.load_month(year, month) or Month(year, month)
+            self.months[key] = result
+        return result
+
+    def apply(self, date_, hours, dayoff):
+        """
+        Set the state of one day as checked in, without updating running totals of its month.
+        """
+        day = self.month(date_.year, date_.month).days[date_.day - 1]
+        if dayoff:
+            day.is_dayoff = True
+            day.scheduled_work_hours = 0
+            day.checkin_manhour = 0
+            day.overtime = 0
+        else:
+            day.is_dayoff = False
+            day.scheduled_work_hours = self.daily_work_hours
+            day.checkin_manhour = hours
+            day.overtime = hours - self.daily_work_hours
+        day.is_past = True
+
+    def commit(self):
+        """
+        Write each month once.
+        """
+        for month in self.months.values():
+            month.refresh()
+            self.store.save_month(month)
+
+
+def worker_root(root, name):
+    """
+    :return: folder of the worker's store under root
+    """
+    if not name or name in (os.curdir, os.pardir) or os.sep in name or (os.altsep and os.altsep in name):
+        raise ValueError("Invalid worker name: {!r}".format(name))
+    path = os.path.join(root, name)
+    if os.path.dirname(os.path.realpath(path)) != os.path.realpath(root):
+        raise ValueError("Invalid worker name: {!r}".format(name))
+    return path
+
+
+def import_timesheet(rows, root=None, chunk_size=CHUNK_SIZE):
+    """
+    Apply rows to days and write each month touched only once at the end, without scheduling.
+    Overtime of a day is counted against daily_work_hours of the job in its store.
+
+    :param rows: iterable of dict, see read_csv() and read_jsonl()
+    :param root: folder holding a store named by each worker, default to the store of your own schedule,
+                 which ignores the worker field, and is imported under the cache lock while the daemon is stopped
+    :param chunk_size: how many rows to parse at a time
+    :return: number of rows imported
+    """
+    if root is not None:
+        return _import(rows, root, chunk_size)
+
+    from mhcalendar import daemon
+    from mhcalendar.io import Cache
+    with Cache.lock():
+        # the daemon would write its schedule in memory over the import
+        if daemon.running():
+            raise Exception("Daemon is running, stop it before importing into your schedule.")
+        return _import(rows, None, chunk_size)
+
+
+def _import(rows, root, chunk_size):
+    workers = {}
+
+    def worker_of(name):
+        worker = workers.get(name)
+        if worker is None:
+            if root is None:
+                from mhcalendar.io import Cache
+                store = Cache.schedule_store()
+            else:
+                store = ScheduleStore(worker_root(root, name))
+            worker = workers[name] = _Worker(store)
+        return worker
+
+    count = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        for row in chunk:
+            name = '' if root is None else str(row.get('worker') or 'default')
+            dayoff = _parse_bool(row.get('dayoff') or False)
+            hours = 0 if dayoff else float(row['hours'])
+            date_ = row['date']
+            worker_of(name).apply(date_ if isinstance(date_, date) else _parse_date(date_), hours, dayoff)
+        count += len(chunk)
+
+    for worker in workers.values():
+        worker.commit()
+    return count
@@ -11,9 +11,22 @@ import calendar
 import json
 import os
 import pickle
+import sys
+from contextlib import contextmanager
 from datetime import date
-from urllib import request
-
+from itertools import islice
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+import mhcalendar.geometry as geometry
+import mhcalendar.holiday as holiday_index
+import mhcalendar.table as table
+from mhcalendar.log import event, span
+from mhcalendar.store import ScheduleStore, copy_days, write_atomic
 from mhcalendar.time_elements import Schedule, Holiday, Month, dec_float
 
 CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.mhcalendar')
@@ -23,19 +36,47 @@ def exist(path):
     return os.path.exists(path)
 
 
-def prepare():
+def prepare(holiday_provider=None, schedule=True):
     """
     Create config folder if not exist, cache holidays if not exist or out of date, and initialize schedule cache.
+
+    :param holiday_provider: HolidayProvider to request holidays, default to compute them offline.
+                             Holidays of a network provider (CalendarService) are revalidated in a detached
+                             process when they are stale, see mhcalendar.fetch.revalidate()
+    :param schedule: initialize schedule cache as well, skip it if you will call load_schedule() later
+    :return: Schedule object restored or initialized, or None if schedule is False
     """
 
     _check_config_path()
 
-    # TODO: Maybe we can prepare holiday data for specific year
-    if not _check_holiday_cache():
-        holidays = update_holiday_schedule() or []
-        Cache.cache_holidays(holidays)
+    thisyear = date.today().year
+    if isinstance(holiday_provider, holiday_index.CalendarService):
+        from mhcalendar.fetch import AsyncCalendarService, revalidate
+        if not isinstance(holiday_provider, AsyncCalendarService):
+            holiday_provider = AsyncCalendarService(holiday_provider.url, holiday_provider.timeout)
+        revalidate(thisyear, thisyear, holiday_provider)
+    elif not _check_holiday_cache():
+        holiday_index.prefetch(thisyear, thisyear, holiday_provider)
+
+    if schedule:
+        return load_schedule()
+
 
-    _init_schedule_cache()
+def load_schedule():
+    """
+    Restore schedule from cache, or initialize the cache with a schedule of current month.
+
+    :return: Schedule object
+    """
+    schedule = Cache.restore_schedule()
+    if not schedule:
+        with Cache.lock():
+            schedule = Cache.restore_schedule()
+            if not schedule:
+                today = date.today()
+                schedule = Schedule(None, Month(today.year, today.month))
+                Cache.cache_schedule(schedule)
+    return schedule
 
 
 def _check_config_path():
@@ -47,67 +88,176 @@ def _check_config_path():
 
 
 def _check_holiday_cache():
-    holiday_cache = Cache.restore_holidays()
-    if holiday_cache and len(holiday_cache) > 0:
-        thisyear = date.today().year
-        if holiday_cache[0].year == str(thisyear):
-            return True
-    return False
-
-
-def _init_schedule_cache():
-    schedule_cache = Cache.restore_schedule()
-    if not schedule_cache:
-        today = date.today()
-        month = Month(today.year, today.month)
-        schedule = Schedule(None, month)
-        Cache.cache_schedule(schedule)
+    return holiday_index.has_year(date.today().year)
 
 
 class Cache:
     HOLIDAY_CACHE_NAME = 'holiday.cache'
+    # ETag and Last-Modified of holiday responses, to revalidate holiday cache
+    HOLIDAY_VALIDATORS_NAME = 'holiday.validators'
+    # binary table of holidays made from holiday cache, to be mapped by worker processes
+    HOLIDAY_TABLE_NAME = 'holiday.table'
+    # pickle cache of the old versions, only to be migrated
     SCHEDULE_CACHE_NAME = 'schedule.cache'
+    SCHEDULE_STORE_NAME = 'schedule'
+    LOCK_NAME = '.lock'
+    # how many times the lock is held by this process
+    _lock_depth = 0
+
+    @classmethod
+    @contextmanager
+    def lock(cls):
+        """
+        Hold the advisory lock of config folder, blocks until other processes release it.
+        Wrap every restore-modify-cache sequence with it, so that no update from other processes is lost.
+        Reading only needs no lock, since every cache file is replaced as a whole by renaming.
+        The lock is reentrant within a process.
+        """
+        if Cache._lock_depth > 0:
+            Cache._lock_depth += 1
+            try:
+                yield
+            finally:
+                Cache._lock_depth -= 1
+            return
+
+        _check_config_path()
+        with open(os.path.join(CONFIG_DIR, Cache.LOCK_NAME), 'a+b') as file:
+            if fcntl:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            Cache._lock_depth = 1
+            try:
+                yield
+            finally:
+                Cache._lock_depth = 0
+                if fcntl:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @classmethod
+    def schedule_store(cls):
+        return ScheduleStore(os.path.join(CONFIG_DIR, Cache.SCHEDULE_STORE_NAME))
 
     @classmethod
     def cache_holidays(cls, holidays):
         _check_config_path()
         path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_CACHE_NAME)
-        try:
-            with open(path, 'w') as file:
-                json.dump(holidays, file)
-        except:
-            print("Failure to open cache file:", path)
+        with span('cache.write_holidays', count=len(holidays)):
+            try:
+                write_atomic(path, json.dumps(holidays).encode())
+            except:
+                print("Failure to open cache file:", path)
+        Cache.cache_holiday_table(holidays)
+        holiday_index.invalidate()
 
     @classmethod
-    def cache_schedule(cls, schedule):
+    def cache_holiday_table(cls, holidays=None):
+        """
+        Write holidays into the binary table, which worker processes map into memory and share, see mhcalendar.table.
+
+        :param holidays: Holiday list, default to holiday cache
+        :return: path of the table, or None if failed to write it
+        """
         _check_config_path()
-        path = os.path.join(CONFIG_DIR, Cache.SCHEDULE_CACHE_NAME)
+        if holidays is None:
+            holidays = Cache.restore_holidays() or []
+        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_TABLE_NAME)
+        with span('cache.write_holiday_table', count=len(holidays)):
+            try:
+                write_atomic(path, table.build(holidays))
+            except:
+                print("Failure to open cache file:", path)
+                return None
+        return path
+
+    @classmethod
+    def holiday_table_path(cls):
+        """
+        :return: path of holiday table, written again if it is missing or older than holiday cache,
+                 or None if failed to write it
+        """
+        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_TABLE_NAME)
+        cache_path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_CACHE_NAME)
+        if exist(path) and (not exist(cache_path) or os.path.getmtime(path) >= os.path.getmtime(cache_path)):
+            return path
+        return Cache.cache_holiday_table()
+
+    @classmethod
+    def cache_validators(cls, validators):
+        """
+        :param validators: dict of url to its validators
+        """
+        _check_config_path()
+        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_VALIDATORS_NAME)
         try:
-            with open(path, 'wb') as file:
-                pickle.dump(schedule, file)
+            write_atomic(path, json.dumps(validators).encode())
         except:
             print("Failure to open cache file:", path)
 
     @classmethod
-    def restore_holidays(cls):
+    def restore_validators(cls):
         """
-        :return: Holiday list or None if no cache is found
+        :return: dict of url to its validators, empty if no cache is found
         """
-        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_CACHE_NAME)
+        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_VALIDATORS_NAME)
         if exist(path):
             try:
                 with open(path, 'r') as file:
-                    jslist = json.load(file)
-                    if jslist and isinstance(jslist, list):
-                        holidays = []
-                        for item in jslist:
-                            holiday = Holiday(*item)
-                            holidays.append(holiday)
-                        return holidays
-                    else:
-                        return None
+                    validators = json.load(file)
+                    if isinstance(validators, dict):
+                        return validators
             except:
                 print("Failure to open cache file:", path)
+        return {}
+
+    @classmethod
+    def cache_schedule(cls, schedule):
+        store = Cache.schedule_store()
+        with span('cache.write_schedule'):
+            try:
+                store.save(schedule)
+            except Exception:
+                print("Failure to write schedule store:", store.root)
+
+    @classmethod
+    def cache_day(cls, schedule, day):
+        """
+        Save the change of one day only, other days and the totals of schedule are left untouched.
+        """
+        store = Cache.schedule_store()
+        with span('cache.write_day', date=day.date):
+            try:
+                store.save_day(schedule.month, day)
+            except Exception:
+                print("Failure to write schedule store:", store.root)
+
+    @classmethod
+    def restore_holidays(cls):
+        """
+        :return: Holiday list or None if no cache is found
+        """
+        path = os.path.join(CONFIG_DIR, Cache.HOLIDAY_CACHE_NAME)
+        if exist(path):
+            with span('cache.read_holidays') as s:
+                try:
+                    with open(path, 'r') as file:
+                        jslist = json.load(file)
+                        if jslist and isinstance(jslist, list):
+                            holidays = []
+                            for item in jslist:
+                                holiday = Holiday(*item)
+                                holidays.append(holiday)
+                            s.set(count=len(holidays))
+                            return holidays
+                        else:
+                            return None
+                except:
+                    print("Failure to open cache file:", path)
         else:
             return None
 
@@ -116,17 +266,46 @@ class Cache:
         """
         :return: Schedule object or None if no cache is found
         """
-        path = os.path.join(CONFIG_DIR, Cache.SCHEDULE_CACHE_NAME)
-        if exist(path):
+        store = Cache.schedule_store()
+        if not store.exists():
+            return Cache.__migrate_schedule_cache(store)
+        with span('cache.read_schedule'):
             try:
-                with open(path, 'rb') as file:
-                    schedule = pickle.load(file)
-                    return schedule if isinstance(schedule, Schedule) else None
-            except:
-                print("Failure to open cache file:", path)
-        else:
+                return store.load()
+            except Exception:
+                print("Failure to read schedule store:", store.root)
+
+    @classmethod
+    def __migrate_schedule_cache(cls, store):
+        """
+        Move the pickle cache of old versions into schedule store.
+
+        :return: Schedule object or None if no cache is found
+        """
+        path = os.path.join(CONFIG_DIR, Cache.SCHEDULE_CACHE_NAME)
+        if not exist(path):
+            return None
+        try:
+            with open(path, 'rb') as file:
+                cached = pickle.load(file)
+        except:
+            print("Failure to open cache file:", path)
+            return None
+        if not isinstance(cached, Schedule):
             return None
 
+        month = Month(cached.month.index['year'], cached.month.index['month'])
+        copy_days(cached.month, month)
+        schedule = Schedule(cached.job, month)
+        schedule.checkin_manhour = cached.checkin_manhour
+        schedule.manhour_remain = cached.manhour_remain
+        schedule.overhours = cached.overhours
+        schedule.manhour_absence = cached.manhour_absence
+        Cache.cache_schedule(schedule)
+        event('cache.migrate', lambda: 'moved {0} into {1}'.format(path, store.root))
+        os.remove(path)
+        return schedule
+
 
 class MHCalendarDrawer:
     """
@@ -142,145 +321,234 @@ class MHCalendarDrawer:
         self.hr_line = '-' * (width + 1) * 7 + '-'
         self.seperator = '|' + ('-' * width + '|') * 7
         self.blank_line = str(' ' * ((width + 1) * 7 + 1))
+        # templates of each width, computed once
+        self.__line_width = self.width * 7 + 8
+        self.__cell_slices = [slice(i * (self.width + 1) + 1, (i + 1) * (self.width + 1)) for i in range(7)]
+        self.__separated_hr_line = self.__separate_line(self.hr_line)
+        self.__blank_cell = ' ' * self.width
+        self.__holiday_cell = '* Holiday *'.center(self.width)
 
     def __separate_line(self, week: str, end=''):
-        week = list(week)
-        distance_to_end = self.width * 7 + 8 - len(week)
-        week += list(' ' * distance_to_end)
-        week[::self.width + 1] = list('|' * 8)
-        return ''.join(week) + end
-
-    def __pipe(self, start, width, *texts, seperator='|', end=''):
-        """
-        The real name is Pile In piPE :P
-
-        :param start: offset to start
-        :param width: pipe's width
-        :param texts: text to fill into a pipe
-        :param seperator: seperator before and after, not count in pipe's width
-        :return: a bamboo...
-        """
-        elements = [' ' * start, seperator]
-        for t in texts:
-            lent = len(t)
-            if lent < width:
-                t += ' ' * (width - lent)
-            t += seperator
-            elements.append(t)
-        elements.append(end)
-        return ''.join(elements)
+        """
+        Pad the line to the width of calendar, and put a pipe between every 2 cells.
+        """
+        if len(week) < self.__line_width:
+            week += ' ' * (self.__line_width - len(week))
+        cells = [week[s] for s in self.__cell_slices]
+        return ''.join(('|', '|'.join(cells), '|', week[self.__line_width:], end))
+
+    def __cell(self, text):
+        """
+        Text padded to the width of a cell, or cut to it with '~' at the end if it is too long.
+        """
+        if len(text) > self.width:
+            return text[:self.width - 1] + '~'
+        return text.ljust(self.width)
+
+    def __week_row(self, first_weekday, texts):
+        """
+        Row of 7 cells, texts fill in from the cell of first_weekday.
+        """
+        cells = [self.__blank_cell] * 7
+        cells[first_weekday:first_weekday + len(texts)] = [self.__cell(t) for t in texts]
+        return ''.join(('|', '|'.join(cells), '|'))
 
     def __packup_week_schedule(self, week):
         first_weekday = week[0].date.weekday()
-        start_index = first_weekday * (self.width + 1)
-        pipes = list()
-
-        holidays = ['* Holiday *'.center(self.width)
-                    if week[i].holiday is not None else ' ' * self.width for i in range(len(week))]
-        schedule_hours = ['Sched: {}'.format(week[i].scheduled_work_hours)
-                          if not week[i].is_dayoff else '-' for i in range(len(week))]
-        overtime_hours = ['OT: {}'.format(week[i].overtime)
-                          if not week[i].is_dayoff else '-' for i in range(len(week))]
-        checkin_hours = ['Checkin: {}'.format(week[i].checkin_manhour)
-                         if not week[i].is_dayoff else '-' for i in range(len(week))]
-        dayoff = ['Dayoff: {}'.format('Yes' if week[i].is_dayoff else 'No') for i in range(len(week))]
-        done = ['Done: {}'.format('Yes' if week[i].is_past else 'No') for i in range(len(week))]
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *holidays), '\n'))
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *schedule_hours), '\n'))
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *overtime_hours), '\n'))
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *checkin_hours), '\n'))
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *dayoff), '\n'))
-        pipes.append(self.__separate_line(self.__pipe(start_index, self.width, *done), '\n'))
-        return pipes
-
-    def __decorate_today(self, month, week_line):
-        if month.today:
-            day = date.today().day
+        holidays, schedule_hours, overtime_hours, checkin_hours, dayoff, done = [], [], [], [], [], []
+        for day in week:
+            holidays.append(self.__holiday_cell if day.holiday is not None else self.__blank_cell)
+            if day.is_dayoff:
+                schedule_hours.append('-')
+                overtime_hours.append('-')
+                checkin_hours.append('-')
+                dayoff.append('Dayoff: Yes')
+            else:
+                schedule_hours.append('Sched: {}'.format(day.scheduled_work_hours))
+                overtime_hours.append('OT: {}'.format(day.overtime))
+                checkin_hours.append('Checkin: {}'.format(day.checkin_manhour))
+                dayoff.append('Dayoff: No')
+            done.append('Done: Yes' if day.is_past else 'Done: No')
+        return [self.__week_row(first_weekday, texts)
+                for texts in (holidays, schedule_hours, overtime_hours, checkin_hours, dayoff, done)]
+
+    @staticmethod
+    def __decorate_today(today, week_line):
+        """
+        :param today: Day object of today, or None if today is not in the month
+        """
+        if today:
+            day = today.date.day
             index = week_line.find(' ' + str(day) + ' ')
             if index > 0:
-                week_line = list(week_line)
-                week_line[index - 1] = '['
                 r_offset = 3 if day < 10 else 4
-                week_line[index + r_offset] = ']'
-                week_line = ''.join(week_line)
+                week_line = ''.join((week_line[:index - 1], '[', week_line[index:index + r_offset], ']',
+                                     week_line[index + r_offset + 1:]))
         return week_line
 
-    def __print_holiday(self, schedule):
-        holidays = schedule.month.holidays
-        if holidays and len(holidays):
-            for holiday in holidays:
-                print('{year}.{month}.{day}  {name}'
-                      .format(year=holiday.year, month=holiday.month, day=holiday.day, name=holiday.name))
+    @staticmethod
+    def __holiday_lines(schedule):
+        return ['{year}.{month}.{day}  {name}'
+                    .format(year=holiday.year, month=holiday.month, day=holiday.day, name=holiday.name)
+                for holiday in schedule.month.holidays or ()]
 
-    def __print_today(self, schedule):
-        day = schedule.month.today
+    @staticmethod
+    def __today_line(today):
         day_name = date.today().strftime('%A')
-        if day:
-            holiday = '** {} **'.format(day.holiday.name) if day.holiday else ''
-            checkin_or_dayoff = '\t Checkin: {}'.format(day.checkin_manhour) if not day.is_dayoff else '\t Day off'
-            print('Today:', str(day.date), day_name, holiday, '\t Schedule(OT):', day.scheduled_work_hours,
-                  '({})'.format(day.overtime), checkin_or_dayoff)
-        else:
-            print('today:', date.today(), day_name)
-
-    def __print_manhour_expect(self, schedule):
+        if today:
+            holiday = '** {} **'.format(today.holiday.name) if today.holiday else ''
+            checkin_or_dayoff = '\t Checkin: {}'.format(today.checkin_manhour) if not today.is_dayoff \
+                else '\t Day off'
+            return ' '.join(('Today:', str(today.date), day_name, holiday, '\t Schedule(OT):',
+                             str(today.scheduled_work_hours), '({})'.format(today.overtime), checkin_or_dayoff))
+        return ' '.join(('today:', str(date.today()), day_name))
+
+    @staticmethod
+    def __manhour_expect_line(schedule):
         workdays = len(schedule.month.days) - len(schedule.dayoff_list)
         salary = schedule.job.required_manhour * schedule.job.hourly_pay
-        print('Expecting:', 'Manhour/Workdays = {0}/{1}d'.format(schedule.job.required_manhour, workdays),
-              '\t Salary = {}'.format(salary))
+        return ' '.join(('Expecting:', 'Manhour/Workdays = {0}/{1}d'.format(schedule.job.required_manhour, workdays),
+                         '\t Salary = {}'.format(salary)))
+
+    @staticmethod
+    def __manhour_fornow_line(schedule):
+        return ' '.join(('For now:  ', 'Checkin manhour = {}'.format(schedule.checkin_manhour),
+                         '\t Remaining manhour = {}'.format(schedule.manhour_remain),
+                         '\t Overtime = {}'.format(schedule.overhours),
+                         '\t Salary = {}'.format(schedule.checkin_manhour * dec_float(schedule.job.hourly_pay))))
+
+    @staticmethod
+    def __manhour_absence_lines(schedule):
+        if schedule.manhour_absence > 0:
+            return ['These manhour can not be scheduled on this month: {}'.format(schedule.manhour_absence)]
+        return []
 
-    def __print_manhour_fornow(self, schedule):
-        print('For now:  ', 'Checkin manhour = {}'.format(schedule.checkin_manhour),
-              '\t Remaining manhour = {}'.format(schedule.manhour_remain),
-              '\t Overtime = {}'.format(schedule.overhours),
-              '\t Salary = {}'.format(schedule.checkin_manhour * dec_float(schedule.job.hourly_pay)))
+    def render(self, schedule: Schedule):
+        """
+        :return: the calendar as a string, the same as draw() outputs
+        """
+        with span('render', year=schedule.month.index['year'], month=schedule.month.index['month']):
+            return self.__render(schedule)
+
+    def __render(self, schedule: Schedule):
+        cal = geometry.text(schedule.month.index['year'], schedule.month.index['month'], self.width)
+        title = ' ' + cal.title
+        day_of_week = ' ' + cal.day_of_week
+        cal_weeks = [' ' + week for week in cal.weeks]
+        today = schedule.month.today
+
+        lines = ['', title, self.hr_line, day_of_week, self.__separated_hr_line]
+        for week_line, week in zip(cal_weeks, schedule.month.weeks):
+            lines.append(self.__separate_line(self.__decorate_today(today, week_line)))
+            lines.extend(self.__packup_week_schedule(week))
+            lines.append(self.__separated_hr_line)
+        lines.append('(Sched = Schedule, OT = Overtime)')
+        lines.extend(self.__holiday_lines(schedule))
+        lines.append('')
+        lines.append(self.__today_line(today))
+        lines.append(self.__manhour_expect_line(schedule))
+        lines.append(self.__manhour_fornow_line(schedule))
+        lines.extend(self.__manhour_absence_lines(schedule))
+        return '\n'.join(lines) + '\n'
+
+    def draw(self, schedule: Schedule, file=None):
+        """
+        Write the calendar by a single write.
 
-    def __print_manhour_absence(self, schedule):
-        if schedule.manhour_absence > 0:
-            print('These manhour can not be scheduled on this month:', schedule.manhour_absence)
-
-    def draw(self, schedule: Schedule):
-        cal = str(calendar.month(schedule.month.index['year'], schedule.month.index['month'], self.width))
-        cal_lines = [' ' + w for w in cal.splitlines() if w != '']
-
-        title = cal_lines.pop(0)
-        day_of_week = cal_lines.pop(0)
-        cal_weeks = cal_lines
-
-        print('', title, self.hr_line, day_of_week, self.__separate_line(self.hr_line), sep='\n')
-        for i in range(len(cal_weeks)):
-            print(self.__separate_line(self.__decorate_today(schedule.month, cal_weeks[i])))
-            print(*self.__packup_week_schedule(schedule.month.weeks[i]), sep='', end='')
-            print(self.__separate_line(self.hr_line))
-        print('(Sched = Schedule, OT = Overtime)')
-        self.__print_holiday(schedule)
-        print('')
-        self.__print_today(schedule)
-        self.__print_manhour_expect(schedule)
-        self.__print_manhour_fornow(schedule)
-        self.__print_manhour_absence(schedule)
-
-
-def update_holiday_schedule():
+        :param file: text file object, default to sys.stdout
+        """
+        (file or sys.stdout).write(self.render(schedule))
+
+
+class RosterDrawer:
+    """
+    Output the month of a team, one person by 2 rows: scheduled hours and overtime of every day.
+    Cells are laid out the same as MHCalendarDrawer, and rows are written page by page.
     """
-    request new schedule list of holidays this year.
+    LABELS = ('Sched', 'OT')
 
-    :return: new list of Holiday or None for update failure.
+    def __init__(self, width=6, name_width=12, page_size=50):
+        """
+        :param width: width of a day's cell, minimum width is limited to 6
+        :param name_width: width of name's cell, longer names are cut
+        :param page_size: how many persons in a page, the header repeats in every page
+        """
+        self.width = 6 if width < 6 else width
+        self.name_width = name_width
+        self.page_size = page_size
+        self.__label_width = max(map(len, RosterDrawer.LABELS))
+
+    def __row(self, name, label, texts, last):
+        cells = [t[:self.width].ljust(self.width) for t in texts]
+        return ''.join((name[:self.name_width].ljust(self.name_width), ' ', label.ljust(self.__label_width),
+                        '|', '|'.join(cells), '| ', last))
+
+    def __header(self, month: Month):
+        """
+        :return: header lines of the month, and the line to separate persons
+        """
+        texts = ['{0:>2} {1}{2}'.format(day.date.day, calendar.day_abbr[day.date.weekday()][:2],
+                                        '*' if day.holiday is not None else '')
+                 for day in month.days]
+        title = '{0} {1}'.format(calendar.month_name[month.index['month']], month.index['year'])
+        head = self.__row('Name', '', texts, 'Absence')
+        hr_line = '-' * len(head)
+        return [title, hr_line, head, hr_line], hr_line
+
+    def __person(self, name, schedule: Schedule):
+        days = schedule.month.days
+        schedule_hours = ['-' if day.is_dayoff else str(day.scheduled_work_hours) for day in days]
+        overtime_hours = ['-' if day.is_dayoff else str(day.overtime) for day in days]
+        return [self.__row(name, RosterDrawer.LABELS[0], schedule_hours, str(schedule.manhour_absence)),
+                self.__row('', RosterDrawer.LABELS[1], overtime_hours, '')]
+
+    def pages(self, roster):
+        """
+        Holds only one page of rows at a time, roster can be a generator of any length.
+
+        :param roster: iterable of (name, Schedule) of the same month
+        :return: generator of each page as a string, with holidays of the month after the last page
+        """
+        roster = iter(roster)
+        header = hr_line = month = None
+        while True:
+            page = list(islice(roster, self.page_size))
+            if not page:
+                break
+            if month is None:
+                month = page[0][1].month
+                header, hr_line = self.__header(month)
+            lines = list(header)
+            for name, schedule in page:
+                if schedule.month.index != month.index:
+                    raise ValueError("Schedule of {0} is not in the month of the roster".format(name))
+                lines.extend(self.__person(name, schedule))
+                lines.append(hr_line)
+            yield '\n'.join(lines) + '\n\n'
+        if month is not None and month.holidays:
+            yield ''.join('{year}.{month}.{day}  {name}\n'
+                              .format(year=holiday.year, month=holiday.month, day=holiday.day, name=holiday.name)
+                          for holiday in month.holidays)
+
+    def draw(self, roster, file=None):
+        """
+        Write the roster by a single write of each page.
+
+        :param roster: iterable of (name, Schedule) of the same month
+        :param file: text file object, default to sys.stdout
+        """
+        file = file or sys.stdout
+        for page in self.pages(roster):
+            file.write(page)
+
+
+def update_holiday_schedule(year=None):
     """
+    request new schedule list of holidays from calendar-service.net.
 
-    url = "http://calendar-service.net/cal?start_year={year}&start_mon=1&end_year={year}&end_mon=12\
-&year_style=normal&month_style=numeric&wday_style=en&format=csv&holiday_only=1".format(year=date.today().year)
-    print('Accessing network to request holiday data...')
-    print('url: ' + url)
-
-    try:
-        with request.urlopen(url) as f:
-            content = [line.decode('EUC-JP').replace('\n', '') for line in f.readlines()]
-            del content[0]
-            content = [line.split(',') for line in content]
-            holidays = [Holiday(*line) for line in content]
-            print('Success.')
-            return holidays
-    except:
-        print("Holiday schedule request failure.")
-        return None
+    :param year: default to this year
+    :return: new list of Holiday or None for update failure.
+    """
+    from mhcalendar.fetch import AsyncCalendarService
+    year = year or date.today().year
+    return AsyncCalendarService().holidays(year, year)
@@ -5,11 +5,162 @@
 # @File    : log.py
 
 """
-Log with switch by VERBOSE
+Log with switch by VERBOSE, and instrumentation of events and timed spans sent to sinks.
+
+Instrumentation is disabled while no sink is added,
+then event() returns at once without evaluating its message, and span() gives a shared no-op.
 """
+import sys
+import time
+
 VERBOSE = False
 
+# callables receiving each record as a dict
+_sinks = []
+
 
 def log(*values, sep=' ', end: str = '\n'):
     if VERBOSE:
         print(*values, sep=sep, end=end)
+
+
+def add_sink(sink):
+    """
+    :param sink: callable receiving each record as a dict, eg. StderrSink, JsonLinesSink or MemorySink
+    """
+    _sinks.append(sink)
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def enabled():
+    return bool(_sinks)
+
+
+def _emit(record):
+    for sink in _sinks:
+        sink(record)
+
+
+def event(name, message=None, **fields):
+    """
+    :param message: text, or callable returning text which is only called while instrumentation is enabled
+    :param fields: extra fields of the record
+    """
+    if not _sinks:
+        return
+    record = {'event': name, 'time': time.time()}
+    if message is not None:
+        record['message'] = message() if callable(message) else message
+    record.update(fields)
+    _emit(record)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, fields):
+        self.record = {'event': name}
+        self.record.update(fields)
+
+    def __enter__(self):
+        self.record['time'] = time.time()
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record['duration_ms'] = (time.perf_counter() - self.__start) * 1000
+        if exc_type is not None:
+            self.record['error'] = repr(exc_value)
+        _emit(self.record)
+        return False
+
+    def set(self, **fields):
+        """
+        Add fields known only inside the span, eg. size of the result.
+        """
+        self.record.update(fields)
+
+
+def span(name, **fields):
+    """
+    Time a block of code, the record is sent to sinks when the block exits:
+
+        with span('cache.write', path=path) as s:
+            ...
+            s.set(size=size)
+
+    :return: context manager
+    """
+    if not _sinks:
+        return _NULL_SPAN
+    return _Span(name, fields)
+
+
+class StderrSink:
+    """
+    Write each record as a line of text.
+    """
+
+    def __init__(self, file=None):
+        """
+        :param file: text file object, default to sys.stderr at the time of writing
+        """
+        self.file = file
+
+    def __call__(self, record):
+        parts = ['[mhcalendar]', record['event']]
+        if 'duration_ms' in record:
+            parts.append('{:.3f} ms'.format(record['duration_ms']))
+        if 'message' in record:
+            parts.append(str(record['message']))
+        parts.extend('{0}={1}'.format(key, value) for key, value in record.items()
+                     if key not in ('event', 'time', 'duration_ms', 'message'))
+        (self.file or sys.stderr).write(' '.join(parts) + '\n')
+
+
+class JsonLinesSink:
+    """
+    Write each record as a line of JSON, values JSON can not hold (eg. Decimal) are written as text.
+    """
+
+    def __init__(self, file):
+        """
+        :param file: text file object
+        """
+        import json
+        self.__dumps = json.dumps
+        self.file = file
+
+    def __call__(self, record):
+        self.file.write(self.__dumps(record, default=str, ensure_ascii=False) + '\n')
+
+
+class MemorySink:
+    """
+    Keep records in memory, eg. to check them in tests.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def names(self):
+        return [record['event'] for record in self.records]
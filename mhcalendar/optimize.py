@@ -0,0 +1,90 @@
+"""
+Search where to take days off.
+
+Schedule.schedule() spreads the manhour remaining over workdays remaining in order of date,
+the hours it gives depend on how many workdays remain, but not on which dates they are.
+So peak daily overtime and manhour_absence are the same for every placement of the same number of days off,
+they are evaluated once, and the days off are placed to make the longest run of workdays as short as possible.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from mhcalendar.time_elements import Schedule, dec_float
+
+Placement = namedtuple('Placement', ('day_off', 'peak_overtime', 'manhour_absence', 'longest_workdays'))
+
+_UNREACHABLE = float('inf')
+
+
+def _longest_workdays(offs, candidates, count):
+    """
+    Choose count of candidates to take off, by search memoized on (day, days off left, workdays in a row).
+    Branches without enough candidates left are pruned.
+
+    :param offs: list of bool for each day, if it is off already
+    :param candidates: set of indexes of days which can be taken off
+    :return: longest run of workdays, and sorted indexes chosen, the earliest ones are preferred in a tie
+    """
+    size = len(offs)
+    # number of candidates from each day to the end
+    candidates_from = [0] * (size + 1)
+    for i in reversed(range(size)):
+        candidates_from[i] = candidates_from[i + 1] + (i in candidates)
+    memo = {}
+
+    def longest(i, left, run):
+        if left > candidates_from[i]:
+            return _UNREACHABLE
+        if i == size:
+            return run
+        key = (i, left, run)
+        if key not in memo:
+            if offs[i]:
+                result = max(run, longest(i + 1, left, 0))
+            else:
+                result = longest(i + 1, left, run + 1)
+                if left and i in candidates:
+                    result = min(max(run, longest(i + 1, left - 1, 0)), result)
+            memo[key] = result
+        return memo[key]
+
+    best = longest(0, count, 0)
+    chosen = []
+    left, run = count, 0
+    for i in range(size):
+        if offs[i]:
+            run = 0
+        elif left and i in candidates and max(run, longest(i + 1, left - 1, 0)) <= best:
+            # taking this day off still reaches the best
+            chosen.append(i)
+            left, run = left - 1, 0
+        else:
+            run += 1
+    return best, chosen
+
+
+def place_dayoff(schedule: Schedule, count, candidates=None, precision=1):
+    """
+    Search where to take count days off in the workdays remaining, the schedule itself is not touched.
+
+    :param count: how many days off to take
+    :param candidates: dates of the month that can be taken off, default to all workdays remaining
+    :param precision: same as Schedule.schedule()
+    :return: Placement with dates to pass to Schedule.adjust(), or None if there are not enough candidates
+    """
+    month = schedule.month
+    workdays = {day.date.day for day in month.workdays_remain}
+    candidates = workdays if candidates is None else workdays.intersection(candidates)
+    if count > len(candidates):
+        print("Only {0} of workdays remaining can be taken off: {1}".format(len(candidates), sorted(candidates)))
+        return None
+
+    offs = [day.is_dayoff for day in month.days]
+    longest, chosen = _longest_workdays(offs, {d - 1 for d in candidates}, count)
+    day_off = [i + 1 for i in chosen]
+
+    fork = schedule.fork()
+    fork.adjust(day_off=day_off)
+    fork.schedule(precision)
+    peak = max((dec_float(day.overtime) for day in fork.month.workdays_remain), default=Decimal(0))
+    return Placement(day_off, peak, fork.manhour_absence, longest)
@@ -0,0 +1,121 @@
+"""
+Payroll report of many workers, summed up from their schedule stores.
+
+Workers are split into chunks, each chunk is summed up in a worker process,
+then partial reports are merged in Decimal, so the totals are exact and do not depend on the order of merging.
+"""
+from collections import namedtuple
+from decimal import Decimal
+from itertools import islice
+from multiprocessing import Pool
+
+from mhcalendar.store import ScheduleStore
+from mhcalendar.table import init_worker
+from mhcalendar.time_elements import Schedule, dec_float
+
+# all in Decimal, salary is figured out the same as the calendar shows for now
+Totals = namedtuple('Totals', ('checkin_manhour', 'overtime', 'manhour_absence', 'salary'))
+
+ZERO = Totals(Decimal(0), Decimal(0), Decimal(0), Decimal(0))
+
+
+def add(a: Totals, b: Totals):
+    return Totals(*(x + y for x, y in zip(a, b)))
+
+
+class Report:
+    """
+    Totals of each worker, each team and each month.
+    """
+
+    def __init__(self):
+        self.workers = {}
+        self.teams = {}
+        # (year, month) as key
+        self.months = {}
+
+    def add(self, worker, team, month, totals: Totals):
+        """
+        :param month: (year, month)
+        """
+        for table, key in ((self.workers, worker), (self.teams, team), (self.months, month)):
+            table[key] = add(table.get(key, ZERO), totals)
+
+    def merge(self, other):
+        """
+        Add totals of other report into this one.
+
+        :return: this report
+        """
+        for table, others in ((self.workers, other.workers), (self.teams, other.teams), (self.months, other.months)):
+            for key, totals in others.items():
+                table[key] = add(table.get(key, ZERO), totals)
+        return self
+
+    @property
+    def total(self):
+        result = ZERO
+        for totals in self.workers.values():
+            result = add(result, totals)
+        return result
+
+
+def month_totals(schedule: Schedule, precision=1):
+    """
+    Schedule the month and sum up its days.
+
+    :return: Totals of the schedule
+    """
+    schedule.schedule(precision)
+    month = schedule.month
+    return Totals(month.past_checkin, month.past_overtime, dec_float(schedule.manhour_absence),
+                  month.past_checkin * dec_float(schedule.job.hourly_pay))
+
+
+def _sum_up(task):
+    records, precision = task
+    report = Report()
+    for worker, team, root in records:
+        store = ScheduleStore(root)
+        job = store.load_job()
+        if job is None:
+            continue
+        for year, month in store.months():
+            schedule = Schedule(job, store.load_month(year, month))
+            report.add(worker, team, (year, month), month_totals(schedule, precision))
+    return report
+
+
+def _chunks(records, chunksize, precision):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunksize))
+        if not chunk:
+            return
+        yield chunk, precision
+
+
+def aggregate(records, precision=1, processes=None, chunksize=64):
+    """
+    Sum up every month in the stores of workers, workers without job are skipped.
+
+    :param records: iterable of (worker, team, folder of ScheduleStore)
+    :param precision: same as Schedule.schedule(), to figure out manhour_absence of each month
+    :param processes: number of worker processes, default to the number of cores, 1 means no pool
+    :param chunksize: how many workers to sum up in a task
+    :return: Report
+    """
+    from mhcalendar.io import Cache
+    tasks = _chunks(records, chunksize, precision)
+    report = Report()
+
+    if processes == 1:
+        # holidays are looked up in the index of this process as they are
+        for task in tasks:
+            report.merge(_sum_up(task))
+        return report
+
+    with Pool(processes, initializer=init_worker, initargs=(Cache.holiday_table_path(),)) as pool:
+        for partial in pool.imap_unordered(_sum_up, tasks):
+            report.merge(partial)
+    return report
@@ -0,0 +1,68 @@
+"""
+What-if simulation of a schedule, eg. what if taking 9th-11th off and scheduling with precision 0.25.
+
+Each scenario runs on a fork of the schedule, the schedule itself and the cache are never touched.
+"""
+from collections import namedtuple
+from decimal import Decimal
+from multiprocessing import Pool
+
+from mhcalendar.time_elements import Schedule, dec_float
+
+Scenario = namedtuple('Scenario', ('name', 'day_off', 'precision'))
+# day_off is the same as Schedule.adjust(), precision is the same as Schedule.schedule()
+Scenario.__new__.__defaults__ = ((), 1)
+
+# overtime and salary are expected of the whole month, both past and scheduled days are counted
+Summary = namedtuple('Summary', ('name', 'workdays', 'overtime', 'manhour_absence', 'salary'))
+
+# schedule shared by scenarios in a worker process
+_base = None
+
+
+def _init_worker(schedule):
+    global _base
+    _base = schedule
+
+
+def summarize(name, schedule: Schedule):
+    """
+    :return: Summary of a scheduled schedule
+    """
+    month = schedule.month
+    workdays = month.workdays_remain
+    scheduled = sum((dec_float(day.scheduled_work_hours) for day in workdays), Decimal(0))
+    overtime = sum((dec_float(day.overtime) for day in workdays), month.past_overtime)
+    hourly_pay = schedule.job.hourly_pay if schedule.job else 0
+    salary = (month.past_checkin + scheduled) * dec_float(hourly_pay)
+    return Summary(name, len(workdays) + month.past_workday_count, overtime, schedule.manhour_absence, salary)
+
+
+def run(schedule: Schedule, scenario: Scenario):
+    """
+    :return: Summary of the scenario, run on a fork of schedule
+    """
+    fork = schedule.fork()
+    fork.adjust(day_off=tuple(scenario.day_off))
+    fork.schedule(scenario.precision)
+    return summarize(scenario.name, fork)
+
+
+def _run_one(scenario):
+    return run(_base, scenario)
+
+
+def simulate(schedule: Schedule, scenarios, processes=1, chunksize=16):
+    """
+    Run scenarios on forks of schedule, which is sent to each worker only once.
+
+    :param scenarios: iterable of Scenario
+    :param processes: number of worker processes, 1 means no pool, None means the number of cores
+    :param chunksize: how many scenarios to send to a worker at a time
+    :return: list of Summary, in the same order as scenarios
+    """
+    if processes == 1:
+        return [run(schedule, scenario) for scenario in scenarios]
+
+    with Pool(processes, initializer=_init_worker, initargs=(schedule,)) as pool:
+        return pool.map(_run_one, scenarios, chunksize)
@@ -0,0 +1,297 @@
+"""
+Compact binary storage of schedules.
+
+A store is a folder holding one head file and one file for each month:
+
+    schedule.head       job, month in process and manhour totals of the schedule
+    YYYY-MM.days        fixed-size record of every day in the month
+    timeline.carried    first month of a Timeline and the hours carried into it
+
+Each day has a record of the same size at a fixed offset, so a month can be loaded alone without touching the others.
+Checking in a day only touches its month file: the file is read, the record of that day is replaced,
+and the whole file is written into a temporary file which is renamed over the old one by write_atomic().
+Every file is replaced this way, a reader sees either the old file or the new one.
+"""
+import os
+import struct
+
+from mhcalendar.job import Job
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+SCHEMA_VERSION = 2
+# versions which can be read, records of version 1 are the same except the head
+SUPPORTED_VERSIONS = (1, 2)
+
+# magic, version, year, month, flags, job's 4 fields, schedule's 4 totals, manhour_carried
+HEAD = struct.Struct('<4sHHBB4d4dd')
+# head of version 1, without manhour_carried
+HEAD_V1 = struct.Struct('<4sHHBB4d4d')
+HEAD_MAGIC = b'MHCS'
+HEAD_FLAG_JOB = 1
+# which of job's 4 fields, manhour_absence and manhour_carried were int, in order of the fields
+HEAD_INT_FLAGS = (2, 4, 8, 16, 32, 64)
+
+# magic, version, year, month, number of days
+MONTH_HEAD = struct.Struct('<4sHHBB')
+MONTH_MAGIC = b'MHCD'
+
+# magic, version, year, month, flags, hours carried into that month
+CARRIED = struct.Struct('<4sHHBBd')
+CARRIED_MAGIC = b'MHCC'
+CARRIED_FLAG_INT = 1
+
+# flags, scheduled work hours, checkin manhour, overtime
+DAY = struct.Struct('<B3d')
+FLAG_DAYOFF = 1
+FLAG_PAST = 2
+# which of the 3 numbers were int, the same bits as DayColumns
+FLAG_INT_SCHEDULE = 4
+FLAG_INT_CHECKIN = 8
+FLAG_INT_OVERTIME = 16
+INT_FLAGS = (FLAG_INT_SCHEDULE, FLAG_INT_CHECKIN, FLAG_INT_OVERTIME)
+
+
+class StoreError(Exception):
+    pass
+
+
+def _check_header(magic, version, expected_magic, path):
+    if magic != expected_magic:
+        raise StoreError("Not a schedule store file: {}".format(path))
+    if version not in SUPPORTED_VERSIONS:
+        raise StoreError("Unsupported schema version {0} of file: {1}".format(version, path))
+
+
+def _int_flags(numbers, int_flags):
+    """
+    :return: bits of int_flags for the numbers which are int
+    """
+    flags = 0
+    for number, flag in zip(numbers, int_flags):
+        if isinstance(number, int):
+            flags |= flag
+    return flags
+
+
+def _restore_ints(flags, numbers, int_flags):
+    """
+    :return: numbers, those flagged as int are converted back to int
+    """
+    return [int(number) if flags & flag else number for number, flag in zip(numbers, int_flags)]
+
+
+def pack_day(day):
+    numbers = (day.scheduled_work_hours, day.checkin_manhour, day.overtime)
+    flags = (FLAG_DAYOFF if day.is_dayoff else 0) | (FLAG_PAST if day.is_past else 0) | \
+        _int_flags(numbers, INT_FLAGS)
+    return DAY.pack(flags, *numbers)
+
+
+def unpack_day(buffer, offset, day):
+    flags, *numbers = DAY.unpack_from(buffer, offset)
+    day.scheduled_work_hours, day.checkin_manhour, day.overtime = _restore_ints(flags, numbers, INT_FLAGS)
+    day.is_dayoff = bool(flags & FLAG_DAYOFF)
+    day.is_past = bool(flags & FLAG_PAST)
+
+
+def copy_days(source: Month, target: Month):
+    """
+    Copy states of every day from source month to target month.
+    """
+    for src, dst in zip(source.days, target.days):
+        dst.is_dayoff = src.is_dayoff
+        dst.scheduled_work_hours = src.scheduled_work_hours
+        dst.checkin_manhour = src.checkin_manhour
+        dst.overtime = src.overtime
+        dst.is_past = src.is_past
+    target.refresh()
+
+
+def write_atomic(path, data: bytes):
+    """
+    Write data into a temporary file and rename it to path,
+    so that a reader can only see the old file or the new one, never a truncated one.
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _decimal_or_zero(number):
+    return dec_float(number) if number else 0
+
+
+class ScheduleStore:
+    HEAD_NAME = 'schedule.head'
+    CARRIED_NAME = 'timeline.carried'
+
+    def __init__(self, root):
+        """
+        :param root: folder of the store
+        """
+        self.root = root
+
+    @property
+    def head_path(self):
+        return os.path.join(self.root, ScheduleStore.HEAD_NAME)
+
+    @property
+    def carried_path(self):
+        return os.path.join(self.root, ScheduleStore.CARRIED_NAME)
+
+    def month_path(self, year, month):
+        return os.path.join(self.root, '{0:04d}-{1:02d}.days'.format(year, month))
+
+    def exists(self):
+        return os.path.exists(self.head_path)
+
+    def months(self):
+        """
+        :return: sorted list of (year, month) stored
+        """
+        result = []
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith('.days') and len(name) == 12:
+                    result.append((int(name[0:4]), int(name[5:7])))
+        return sorted(result)
+
+    def save(self, schedule: Schedule):
+        """
+        Save the whole schedule, including its month.
+        """
+        self.save_month(schedule.month)
+        self.save_head(schedule)
+
+    def save_head(self, schedule: Schedule):
+        job = schedule.job
+        job_fields = (job.required_manhour, job.daily_work_hours, job.hourly_pay, job.max_daily_overhours) \
+            if job else (0, 0, 0, 0)
+        flags = (HEAD_FLAG_JOB if job else 0) | \
+            _int_flags(job_fields + (schedule.manhour_absence, schedule.manhour_carried), HEAD_INT_FLAGS)
+        data = HEAD.pack(HEAD_MAGIC, SCHEMA_VERSION,
+                         schedule.month.index['year'], schedule.month.index['month'],
+                         flags, *job_fields,
+                         schedule.checkin_manhour, schedule.manhour_remain, schedule.overhours,
+                         schedule.manhour_absence, schedule.manhour_carried)
+        write_atomic(self.head_path, data)
+
+    def save_month(self, month: Month):
+        year, mon = month.index['year'], month.index['month']
+        data = [MONTH_HEAD.pack(MONTH_MAGIC, SCHEMA_VERSION, year, mon, len(month.days))]
+        data.extend(pack_day(day) for day in month.days)
+        write_atomic(self.month_path(year, mon), b''.join(data))
+
+    def save_day(self, month: Month, day):
+        """
+        Change only the record of one day, records of other days are kept as they are in the file.
+        The month file is replaced by write_atomic() instead of being written in place,
+        so that a reader never sees a torn record, even on a network file system.
+        """
+        path = self.month_path(month.index['year'], month.index['month'])
+        if not os.path.exists(path):
+            self.save_month(month)
+            return
+        with open(path, 'rb') as file:
+            data = bytearray(file.read())
+        offset = MONTH_HEAD.size + (day.date.day - 1) * DAY.size
+        data[offset:offset + DAY.size] = pack_day(day)
+        write_atomic(path, bytes(data))
+
+    def save_carried(self, year, month, carried):
+        """
+        Save the hours carried into the first month of a timeline, which the head can not keep
+        once it is moved to a later month.
+        """
+        flags = _int_flags((carried,), (CARRIED_FLAG_INT,))
+        write_atomic(self.carried_path, CARRIED.pack(CARRIED_MAGIC, SCHEMA_VERSION, year, month, flags, carried))
+
+    def load_carried(self, year, month):
+        """
+        :return: hours carried into the month saved by save_carried(), or None if they are not saved for that month
+        """
+        if not os.path.exists(self.carried_path):
+            return None
+        with open(self.carried_path, 'rb') as file:
+            magic, version, saved_year, saved_month, flags, carried = CARRIED.unpack(file.read(CARRIED.size))
+        _check_header(magic, version, CARRIED_MAGIC, self.carried_path)
+        if (saved_year, saved_month) != (year, month):
+            return None
+        return _restore_ints(flags, (carried,), (CARRIED_FLAG_INT,))[0]
+
+    def __read_head(self):
+        with open(self.head_path, 'rb') as file:
+            data = file.read(HEAD.size)
+        magic, version = struct.unpack_from('<4sH', data)
+        _check_header(magic, version, HEAD_MAGIC, self.head_path)
+        if version == 1:
+            return HEAD_V1.unpack(data) + (0,)
+        return HEAD.unpack(data)
+
+    @staticmethod
+    def __job_of(fields):
+        if not fields[4] & HEAD_FLAG_JOB:
+            return None
+        # bypass Job.__init__() which would adjust and print again
+        job = Job.__new__(Job)
+        job.required_manhour, job.daily_work_hours, job.hourly_pay, job.max_daily_overhours = \
+            _restore_ints(fields[4], fields[5:9], HEAD_INT_FLAGS)
+        return job
+
+    def load_job(self):
+        """
+        :return: Job object or None if the store is empty or has no job
+        """
+        if not self.exists():
+            return None
+        return self.__job_of(self.__read_head())
+
+    def load(self, holidays=None):
+        """
+        :return: Schedule object or None if the store is empty
+        """
+        if not self.exists():
+            return None
+        fields = self.__read_head()
+        year, mon = fields[2:4]
+
+        month = self.load_month(year, mon, holidays) or Month(year, mon, holidays)
+        schedule = Schedule(self.__job_of(fields), month)
+        checkin, remain, overhours, absence, carried = fields[9:]
+        schedule.checkin_manhour = _decimal_or_zero(checkin)
+        schedule.manhour_remain = _decimal_or_zero(remain)
+        schedule.overhours = _decimal_or_zero(overhours)
+        schedule.manhour_absence = _restore_ints(fields[4], (absence,), HEAD_INT_FLAGS[4:])[0]
+        schedule.manhour_carried = _restore_ints(fields[4], (carried,), HEAD_INT_FLAGS[5:])[0]
+        return schedule
+
+    def load_month(self, year, month, holidays=None):
+        """
+        Load one month alone.
+
+        :return: Month object or None if the month is not stored
+        """
+        path = self.month_path(year, month)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, _, _, count = MONTH_HEAD.unpack_from(data)
+        _check_header(magic, version, MONTH_MAGIC, path)
+
+        result = Month(year, month, holidays)
+        for i, day in enumerate(result.days[:count]):
+            unpack_day(data, MONTH_HEAD.size + i * DAY.size, day)
+        result.refresh()
+        return result
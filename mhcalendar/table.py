@@ -0,0 +1,191 @@
+"""
+Binary table of holidays and months, to be mapped into memory and shared by worker processes.
+
+    head       magic, version, first year, number of years, number of holidays, offset of strings
+    years      1 byte for each year, 1 if holidays of that year are known
+    months     fixed-size record of each month of the years
+    holidays   fixed-size record of each holiday, in order of date
+    strings    UTF-8 text of holidays' fields, each field is referred by offset and length
+
+Lookups read the records in the buffer directly, Holiday objects are only created when they are asked for.
+"""
+import mmap
+import struct
+from datetime import date
+
+import mhcalendar.holiday as holiday_index
+from mhcalendar.holiday import Holiday, date_of
+
+TABLE_VERSION = 1
+
+# magic, version, first year, number of years, number of holidays, offset of strings
+HEAD = struct.Struct('<4sHHHII')
+TABLE_MAGIC = b'MHCT'
+
+# ordinal of the first day, bit mask of holidays (bit 0 is the 1st), weekday of the first day, number of days,
+# number of holidays, index of the first holiday
+MONTH = struct.Struct('<IIBBHI')
+
+# ordinal, then offset and length of each field of Holiday
+HOLIDAY = struct.Struct('<I' + 'IH' * len(Holiday._fields))
+
+
+class TableError(Exception):
+    pass
+
+
+def build(holidays):
+    """
+    :param holidays: Holiday list of any years
+    :return: bytes of the table
+    """
+    holidays = sorted(holidays, key=date_of)
+    years = sorted(set(int(holiday.year) for holiday in holidays))
+    first_year = years[0] if years else 0
+    year_count = years[-1] - first_year + 1 if years else 0
+
+    strings = bytearray()
+    offsets = {}
+
+    def refer(text):
+        encoded = text.encode('utf-8')
+        if encoded not in offsets:
+            offsets[encoded] = len(strings)
+            strings.extend(encoded)
+        return offsets[encoded], len(encoded)
+
+    records = []
+    months = {}
+    for i, holiday in enumerate(holidays):
+        date_ = date_of(holiday)
+        fields = []
+        for value in holiday:
+            fields.extend(refer(str(value)))
+        records.append(HOLIDAY.pack(date_.toordinal(), *fields))
+        month = months.setdefault((date_.year, date_.month), [0, 0, i])
+        month[0] |= 1 << (date_.day - 1)
+        month[1] += 1
+
+    known = bytearray(year_count)
+    for year in years:
+        known[year - first_year] = 1
+
+    month_records = []
+    for year in range(first_year, first_year + year_count):
+        for mon in range(1, 13):
+            first = date(year, mon, 1)
+            days = ((date(year + 1, 1, 1) if mon == 12 else date(year, mon + 1, 1)) - first).days
+            mask, count, index = months.get((year, mon), (0, 0, 0))
+            month_records.append(MONTH.pack(first.toordinal(), mask, first.weekday(), days, count, index))
+
+    strings_offset = HEAD.size + year_count + MONTH.size * len(month_records) + HOLIDAY.size * len(records)
+    head = HEAD.pack(TABLE_MAGIC, TABLE_VERSION, first_year, year_count, len(records), strings_offset)
+    return b''.join([head, bytes(known)] + month_records + records + [bytes(strings)])
+
+
+def init_worker(path):
+    """
+    Initializer of a worker process, look up holidays in the table mapped from path,
+    or in holiday cache if path is None, as the table could not be written.
+    The table is mapped until the worker exits, never call it in a process which goes on after the work.
+    """
+    if path is None:
+        holiday_index.invalidate()
+    else:
+        holiday_index.use_table(HolidayTable.open(path))
+
+
+class HolidayTable:
+    """
+    Look up holidays and months in the buffer of a table.
+    """
+
+    def __init__(self, buffer):
+        """
+        :param buffer: bytes, mmap or any buffer of a table made by build()
+        """
+        magic, version, self.first_year, self.year_count, self.holiday_count, self.__strings = \
+            HEAD.unpack_from(buffer)
+        if magic != TABLE_MAGIC:
+            raise TableError("Not a holiday table")
+        if version != TABLE_VERSION:
+            raise TableError("Unsupported table version {}".format(version))
+        self.buffer = buffer
+        self.__months = HEAD.size + self.year_count
+        self.__holidays = self.__months + MONTH.size * 12 * self.year_count
+
+    @classmethod
+    def open(cls, path):
+        """
+        Map the table file into memory read-only, its pages are shared by every process mapping it.
+        """
+        with open(path, 'rb') as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def has_year(self, year):
+        """
+        :return: if holidays of that year are known
+        """
+        offset = year - self.first_year
+        return 0 <= offset < self.year_count and self.buffer[HEAD.size + offset] == 1
+
+    def __month(self, year, month):
+        offset = year - self.first_year
+        if not 0 <= offset < self.year_count:
+            return None
+        return MONTH.unpack_from(self.buffer, self.__months + (offset * 12 + month - 1) * MONTH.size)
+
+    def month_info(self, year, month):
+        """
+        :return: (weekday of the first day, number of days, bit mask of holidays whose bit 0 is the 1st),
+                 or None if the year is out of the table
+        """
+        record = self.__month(year, month)
+        return None if record is None else record[2:4] + record[1:2]
+
+    def is_holiday(self, date_: date):
+        record = self.__month(date_.year, date_.month)
+        return record is not None and bool(record[1] >> (date_.day - 1) & 1)
+
+    def __holiday(self, index):
+        fields = HOLIDAY.unpack_from(self.buffer, self.__holidays + index * HOLIDAY.size)
+        start = self.__strings
+        return Holiday(*(bytes(self.buffer[start + offset:start + offset + length]).decode('utf-8')
+                         for offset, length in zip(fields[1::2], fields[2::2])))
+
+    def __ordinal(self, index):
+        return struct.unpack_from('<I', self.buffer, self.__holidays + index * HOLIDAY.size)[0]
+
+    def holiday(self, date_: date):
+        """
+        :return: Holiday of that date or None
+        """
+        record = self.__month(date_.year, date_.month)
+        if record is None or not record[1] >> (date_.day - 1) & 1:
+            return None
+        ordinal = date_.toordinal()
+        for index in range(record[5], record[5] + record[4]):
+            if self.__ordinal(index) == ordinal:
+                return self.__holiday(index)
+
+    def holidays_of_month(self, year, month):
+        """
+        :return: Holiday list of the month
+        """
+        record = self.__month(year, month)
+        if record is None:
+            return []
+        return [self.__holiday(index) for index in range(record[5], record[5] + record[4])]
+
+    def holidays_of_year(self, year):
+        """
+        :return: Holiday list of the year
+        """
+        result = []
+        for month in range(1, 13):
+            result.extend(self.holidays_of_month(year, month))
+        return result
@@ -7,84 +7,269 @@
 """
 Process overall information of one month.
 """
-import calendar
-from collections import namedtuple
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
 from datetime import date, datetime, timezone, timedelta
-from decimal import Decimal
-from functools import reduce
+from decimal import Context, Decimal, MAX_EMAX, MAX_PREC, MIN_EMIN, getcontext
 
+import mhcalendar.holiday as holiday_index
+from mhcalendar.geometry import geometry
+from mhcalendar.holiday import Holiday
 from mhcalendar.job import Job
-from mhcalendar.log import log
-
-Holiday = namedtuple('Holiday',
-                     ('year', 'month', 'day', 'year_name', 'year_count', 'weekday', 'weekday_number', 'name'))
+import mhcalendar.log
+from mhcalendar.log import event, log, span
 
 
 class Month:
-    def __init__(self, year, month):
+    def __init__(self, year, month, holidays=None):
+        """
+        :param holidays: Holiday list to pick this month's holidays from, default to the process-wide holiday index
+        """
         self.index = {'year': year, 'month': month}
-        self.dates = list(
-            filter(lambda date_: date_.month == month, calendar.Calendar().itermonthdates(year, month)))
+        first = date(year, month, 1).toordinal()
+        dates = [date.fromordinal(first + i) for i in range(len(geometry(year, month).cells))]
+        # all days' data of this month, Day objects are only views of it
+        self.columns = DayColumns(dates)
+
+        holidays_of_date = holiday_index.holidays_of_month(year, month) if holidays is None \
+            else holiday_index.index_by_date(holidays)
+        self.holidays = [holidays_of_date[d] for d in dates if d in holidays_of_date]
+        self.__dates2columns(dates, holidays_of_date)
+        # Day and week lists are created at the first access
+        self.__days = None
+        self.__weeks = None
+        self.refresh()
+
+    def __setstate__(self, state):
+        if 'columns' in state:
+            self.__dict__.update(state)
+            if 'past_workday_count' not in state:
+                # pickled before past workdays are counted
+                self.refresh()
+            return
+        # Month pickled by old versions, whose days are objects
+        self.__init__(state['index']['year'], state['index']['month'], state['holidays'])
+        for src, dst in zip(state['days'], self.days):
+            dst.is_dayoff = src.is_dayoff
+            dst.scheduled_work_hours = src.scheduled_work_hours
+            dst.checkin_manhour = src.checkin_manhour
+            dst.overtime = src.overtime
+            dst.is_past = src.is_past
+        self.refresh()
+
+    def fork(self):
+        """
+        Copy of this month to change without touching it.
+        Dates and holidays are shared, only the columns of numbers and flags are copied.
+
+        :return: Month object
+        """
+        result = Month.__new__(Month)
+        result.index = dict(self.index)
+        result.columns = self.columns.fork()
+        result.holidays = self.holidays
+        result.__days = None
+        result.__weeks = None
+        result.__past_checkin = self.__past_checkin.copy()
+        result.__past_overtime = self.__past_overtime.copy()
+        result.past_count = self.past_count
+        result.past_workday_count = self.past_workday_count
+        result.__workdays_remain = list(self.__workdays_remain)
+        result.__dayoff_remain = list(self.__dayoff_remain)
+        return result
+
+    @property
+    def days(self):
+        """
+        :return: list of Day
+        """
+        if self.__days is None:
+            self.__days = [Day.view(self.columns, i, self) for i in range(len(self.columns))]
+        return self.__days
+
+    @property
+    def weeks(self):
+        """
+        :return: list of weeks, each is a list of Day from Monday to Sunday, first and last week may be shorter
+        """
+        if self.__weeks is None:
+            self.__weeks = self.__days2weeks()
+        return self.__weeks
+
+    def refresh(self):
+        """
+        Recount the running totals of all days,
+        call it after changing days' attributes directly instead of by their methods.
+        """
+        # check-in and overtime summed up from past days
+        self.__past_checkin = _DecimalSum()
+        self.__past_overtime = _DecimalSum()
+        self.past_count = 0
+        # past days which are not days off
+        self.past_workday_count = 0
+        # indexes of the days not past, in order of date
+        self.__workdays_remain = []
+        self.__dayoff_remain = []
+        for i in range(len(self.columns)):
+            self.__attach(i)
+
+    @property
+    def past_checkin(self):
+        """
+        :return: check-in summed up from past days (Decimal type)
+        """
+        value = self.__past_checkin.value
+        return self.__sum_past('checkin') if value is None else value
+
+    @property
+    def past_overtime(self):
+        """
+        :return: overtime summed up from past days (Decimal type)
+        """
+        value = self.__past_overtime.value
+        return self.__sum_past('overtime') if value is None else value
+
+    def __sum_past(self, column):
+        """
+        Add up column of past days in order of date, only for the sums too long to be kept by running totals.
+        """
+        columns = self.columns
+        return sum((dec_float(columns.number(column, i)) for i in range(len(columns))
+                    if columns.flags[i] & DayColumns.FLAG_PAST), Decimal(0))
+
+    @property
+    def workdays_remain(self):
+        """
+        :return: list of workdays not past, in order of date
+        """
+        days = self.days
+        return [days[i] for i in self.__workdays_remain]
+
+    @property
+    def dayoff_remain(self):
+        """
+        :return: list of days off not past, in order of date
+        """
+        days = self.days
+        return [days[i] for i in self.__dayoff_remain]
+
+    def _remain_indexes(self):
+        """
+        :return: (indexes of workdays not past, indexes of days off not past), both in order of date
+        """
+        return self.__workdays_remain, self.__dayoff_remain
+
+    def _detach(self, day):
+        """
+        Take the day out of running totals before it changes.
+        """
+        columns, index = self.columns, day._index
+        flags = columns.flags[index]
+        if flags & DayColumns.FLAG_PAST:
+            self.__past_checkin.remove(dec_float(columns.number('checkin', index)))
+            self.__past_overtime.remove(dec_float(columns.number('overtime', index)))
+            self.past_count -= 1
+            if not flags & DayColumns.FLAG_DAYOFF:
+                self.past_workday_count -= 1
+        else:
+            remain = self.__dayoff_remain if flags & DayColumns.FLAG_DAYOFF else self.__workdays_remain
+            del remain[bisect_left(remain, index)]
 
-        from mhcalendar.io import Cache
-        holidays_one_year = Cache.restore_holidays() or []
-        self.holidays = list(filter(lambda ho: ho.month == str(self.index['month']), holidays_one_year))
-        self.days = self.__dates2days()
-        self.weeks = self.__days2weeks()
+    def _attach(self, day):
+        """
+        Put the day into running totals after it changes.
+        """
+        self.__attach(day._index)
+
+    def __attach(self, index):
+        columns = self.columns
+        flags = columns.flags[index]
+        if flags & DayColumns.FLAG_PAST:
+            self.__past_checkin.add(dec_float(columns.number('checkin', index)))
+            self.__past_overtime.add(dec_float(columns.number('overtime', index)))
+            self.past_count += 1
+            if not flags & DayColumns.FLAG_DAYOFF:
+                self.past_workday_count += 1
+        else:
+            insort(self.__dayoff_remain if flags & DayColumns.FLAG_DAYOFF else self.__workdays_remain, index)
+
+    @property
+    def dates(self):
+        """
+        :return: list of date in this month
+        """
+        return [date.fromordinal(ordinal) for ordinal in self.columns.ordinals]
+
+    def index_of(self, date_):
+        """
+        :return: index of the day of date_, or None if date_ is not in this month
+        """
+        index = date_.toordinal() - self.columns.ordinals[0]
+        return index if 0 <= index < len(self.columns) else None
+
+    def day_of(self, date_):
+        """
+        :return: the Day object of date_, or None if date_ is not in this month
+        """
+        index = self.index_of(date_)
+        return None if index is None else self.days[index]
+
+    def __range(self, start, end):
+        first = self.columns.ordinals[0]
+        return max(start.toordinal() - first, 0), min(end.toordinal() - first + 1, len(self.columns))
+
+    def between(self, start, end):
+        """
+        :return: list of Day from start to end (inclusive) in this month
+        """
+        low, high = self.__range(start, end)
+        return self.days[low:high] if low < high else []
+
+    def workdays_between(self, start, end):
+        """
+        :return: list of workdays not past from start to end (inclusive), in order of date
+        """
+        low, high = self.__range(start, end)
+        remain = self.__workdays_remain
+        days = self.days
+        return [days[i] for i in remain[bisect_left(remain, low):bisect_left(remain, high)]]
 
     @property
     def today(self):
         """
         :return: the Day object of today, or None if today is not in this month
         """
-        td = date.today()
-        if td in self.dates:
-            index = self.dates.index(td)
-            return self.days[index]
+        return self.day_of(date.today())
 
     @property
     def next_day(self):
         """
-        Obtain the next day that is not past.
+        Obtain the next day that is not past, which is the first of the days not past kept by running totals.
 
         :return: object Day or None
         """
-        for day in self.days:
-            if not day.is_past:
-                return day
+        workdays, dayoff = self.__workdays_remain, self.__dayoff_remain
+        if workdays and dayoff:
+            return self.days[min(workdays[0], dayoff[0])]
+        if workdays or dayoff:
+            return self.days[(workdays or dayoff)[0]]
 
-    def __dates2days(self):
+    def __dates2columns(self, dates, holidays_of_date):
         """
-        adapt dates to days
-
-        :return: list of Day
+        fill holidays and days off into columns
         """
-
-        days = []
-        holidays = self.holidays.copy()
-        for date_ in self.dates:
-            holiday = None
-            if len(holidays) > 0 and holidays[0].day == str(date_.day):
-                holiday = holidays[0]
-                del holidays[0]
-
+        for i, date_ in enumerate(dates):
+            holiday = holidays_of_date.get(date_)
+            if holiday is not None:
+                self.columns.holidays[i] = holiday
             # weekday 5 means Saturday
-            dayoff = holiday is not None or date_.weekday() >= 5
-            days.append(Day(date_, holiday, dayoff))
-        return days
+            if holiday is not None or date_.weekday() >= 5:
+                self.columns.flags[i] |= DayColumns.FLAG_DAYOFF
 
     def __days2weeks(self):
-        today = date.today()
-        date_matrix = calendar.Calendar().monthdayscalendar(today.year, today.month)
-        date_list = list(filter(lambda d: d > 0, calendar.Calendar().itermonthdays(today.year, today.month)))
-        weeks = []
-        for w in date_matrix:
-            week = []
-            weeks.append(week)
-            for d in w:
-                if d > 0:
-                    week.append(self.days[date_list.index(d)])
-        return weeks
+        days = self.days
+        return [[days[i] for i in week] for week in geometry(self.index['year'], self.index['month']).weeks]
 
     def __str__(self):
         return "MonthlyCalendar({year}, {month} days: {days})".format(year=self.index['year'],
@@ -95,10 +280,178 @@ class Month:
         return self.__str__()
 
 
+class _DecimalSum:
+    """
+    Sum of Decimal numbers which numbers can also be taken out of,
+    its value has the same digits as adding up the numbers in it from scratch.
+    """
+    __slots__ = ('total', 'exponents', 'magnitudes')
+    # the sum is kept exact, however many digits it takes
+    EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+    def __init__(self):
+        self.total = Decimal(0)
+        # exponent of the numbers in the sum: how many of them
+        self.exponents = Counter()
+        # exponent of the most significant digit of the numbers in the sum: how many of them
+        self.magnitudes = Counter()
+
+    def add(self, number: Decimal):
+        self.total = _DecimalSum.EXACT.add(self.total, number)
+        self.exponents[number.as_tuple().exponent] += 1
+        self.magnitudes[number.adjusted()] += 1
+
+    def remove(self, number: Decimal):
+        self.total = _DecimalSum.EXACT.subtract(self.total, number)
+        _DecimalSum.__take(self.exponents, number.as_tuple().exponent)
+        _DecimalSum.__take(self.magnitudes, number.adjusted())
+
+    @staticmethod
+    def __take(counter, key):
+        counter[key] -= 1
+        if not counter[key]:
+            del counter[key]
+
+    @property
+    def value(self):
+        """
+        :return: Decimal, or None if adding up the numbers could take more digits than the context,
+                 which would be rounded depending on the order of the numbers
+        """
+        if not self.exponents:
+            return Decimal(0)
+        exponent = min(min(self.exponents), 0)
+        # a sum of up to 100 numbers has at most 2 digits more than the biggest of them
+        if max(max(self.magnitudes), 0) + 2 - exponent >= getcontext().prec:
+            return None
+        # a number taken out may have left more digits than the numbers remaining
+        return self.total.quantize(Decimal(1).scaleb(exponent))
+
+    def copy(self):
+        result = _DecimalSum()
+        result.total = self.total
+        result.exponents = Counter(self.exponents)
+        result.magnitudes = Counter(self.magnitudes)
+        return result
+
+
+class DayColumns:
+    """
+    Data of days stored by columns, one item for each day.
+    Numbers are stored as float, with flags to remember which of them were set as int.
+    """
+    FLAG_DAYOFF = 1
+    FLAG_PAST = 2
+    FLAG_INT_SCHEDULE = 4
+    FLAG_INT_CHECKIN = 8
+    FLAG_INT_OVERTIME = 16
+    # all numbers are 0 of int by default
+    FLAG_DEFAULT = FLAG_INT_SCHEDULE | FLAG_INT_CHECKIN | FLAG_INT_OVERTIME
+    INT_FLAGS = {'scheduled': FLAG_INT_SCHEDULE, 'checkin': FLAG_INT_CHECKIN, 'overtime': FLAG_INT_OVERTIME}
+
+    def __init__(self, dates):
+        count = len(dates)
+        self.ordinals = array('l', (d.toordinal() for d in dates))
+        self.scheduled = array('d', bytes(8 * count))
+        self.checkin = array('d', bytes(8 * count))
+        self.overtime = array('d', bytes(8 * count))
+        self.flags = bytearray([DayColumns.FLAG_DEFAULT]) * count
+        # index of day to Holiday, only for holidays
+        self.holidays = {}
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def schedule_units(self, indexes, units, daily, scale):
+        """
+        Set scheduled hours and overtime of days from fixed-point units, the same as Schedule.schedule() does by Day.
+
+        :param indexes: indexes of days
+        :param units: scheduled units of each day
+        :param daily: units of daily work hours, units beyond it are overtime
+        :param scale: units of an hour
+        """
+        scheduled, overtime, flags = self.scheduled, self.overtime, self.flags
+        for index, unit in zip(indexes, units):
+            scheduled[index] = unit / scale
+            if unit > daily:
+                overtime[index] = (unit - daily) / scale
+                flags[index] &= ~(DayColumns.FLAG_INT_SCHEDULE | DayColumns.FLAG_INT_OVERTIME)
+            else:
+                overtime[index] = 0
+                flags[index] = flags[index] & ~DayColumns.FLAG_INT_SCHEDULE | DayColumns.FLAG_INT_OVERTIME
+
+    def clear_hours(self, indexes):
+        """
+        Set scheduled hours and overtime of days to 0.
+        """
+        scheduled, overtime, flags = self.scheduled, self.overtime, self.flags
+        for index in indexes:
+            scheduled[index] = 0
+            overtime[index] = 0
+            flags[index] |= DayColumns.FLAG_INT_SCHEDULE | DayColumns.FLAG_INT_OVERTIME
+
+    def fork(self):
+        """
+        :return: DayColumns sharing ordinals with this one, with copies of the other columns
+        """
+        result = DayColumns.__new__(DayColumns)
+        result.ordinals = self.ordinals
+        result.scheduled = self.scheduled[:]
+        result.checkin = self.checkin[:]
+        result.overtime = self.overtime[:]
+        result.flags = self.flags[:]
+        result.holidays = dict(self.holidays)
+        return result
+
+    def number(self, column, index):
+        """
+        :param column: 'scheduled', 'checkin' or 'overtime'
+        :return: number at index of column, as int or float
+        """
+        value = getattr(self, column)[index]
+        return int(value) if self.flags[index] & DayColumns.INT_FLAGS[column] else value
+
+
+def _flag_property(flag):
+    def getter(self):
+        return bool(self._columns.flags[self._index] & flag)
+
+    def setter(self, value):
+        if value:
+            self._columns.flags[self._index] |= flag
+        else:
+            self._columns.flags[self._index] &= ~flag
+
+    return property(getter, setter)
+
+
+def _number_property(column):
+    int_flag = DayColumns.INT_FLAGS[column]
+
+    def getter(self):
+        return self._columns.number(column, self._index)
+
+    def setter(self, value):
+        getattr(self._columns, column)[self._index] = value
+        if isinstance(value, int):
+            self._columns.flags[self._index] |= int_flag
+        else:
+            self._columns.flags[self._index] &= ~int_flag
+
+    return property(getter, setter)
+
+
 class Day:
+    """
+    View of one day in DayColumns.
+    """
+    __slots__ = ('_columns', '_index', 'month')
+
     def __init__(self, date_: date, holiday: Holiday = None, dayoff=False,
                  schedule=0, checkin=0, overtime=0, past=False):
-        self.date = date_
+        self._columns = DayColumns([date_])
+        self._index = 0
         self.holiday = holiday
         self.is_dayoff = dayoff
         self.scheduled_work_hours = schedule
@@ -106,6 +459,49 @@ class Day:
         # overtime at past day stands for OT indeed, otherwise it only stands for scheduled-OT
         self.overtime = overtime
         self.is_past = past
+        # Month this day belongs to, which keeps running totals of its days
+        self.month = None
+
+    @classmethod
+    def view(cls, columns: DayColumns, index, month=None):
+        """
+        :return: Day object of the day at index of columns
+        """
+        day = cls.__new__(cls)
+        day._columns = columns
+        day._index = index
+        day.month = month
+        return day
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # Day pickled by old versions, with attributes in __dict__
+            self.__init__(state['date'], state['holiday'], state['is_dayoff'], state['scheduled_work_hours'],
+                          state['checkin_manhour'], state['overtime'], state['is_past'])
+            return
+        for name, value in state[1].items():
+            setattr(self, name, value)
+
+    @property
+    def date(self):
+        return date.fromordinal(self._columns.ordinals[self._index])
+
+    @property
+    def holiday(self):
+        return self._columns.holidays.get(self._index)
+
+    @holiday.setter
+    def holiday(self, holiday):
+        if holiday is None:
+            self._columns.holidays.pop(self._index, None)
+        else:
+            self._columns.holidays[self._index] = holiday
+
+    is_dayoff = _flag_property(DayColumns.FLAG_DAYOFF)
+    is_past = _flag_property(DayColumns.FLAG_PAST)
+    scheduled_work_hours = _number_property('scheduled')
+    checkin_manhour = _number_property('checkin')
+    overtime = _number_property('overtime')
 
     def checkin(self, hours=0, past=True):
         """
@@ -114,19 +510,39 @@ class Day:
         :param hours: man hours today, default 0 means check in as scheduled manhour
         :param past: if work today has done or not
         """
+        self.__detach()
         self.checkin_manhour = hours if hours > 0 else self.scheduled_work_hours
         if past:
             self.overtime -= self.scheduled_work_hours - self.checkin_manhour
         self.is_past = past
+        self.__attach()
 
     def dayoff(self):
         """
         You should only set day off the day which is NOT past.
         """
+        self.__detach()
         self.is_dayoff = True
         self.checkin_manhour = 0
         self.schedule(0)
         self.overtime = 0
+        self.__attach()
+
+    def onduty(self):
+        """
+        You should only set on duty the day which is NOT past.
+        """
+        self.__detach()
+        self.is_dayoff = False
+        self.__attach()
+
+    def __detach(self):
+        if self.month:
+            self.month._detach(self)
+
+    def __attach(self):
+        if self.month:
+            self.month._attach(self)
 
     def schedule(self, hours=0):
         """
@@ -158,6 +574,22 @@ class Schedule:
         self.overhours = 0
         # hours that CAN NOT be scheduled on this month
         self.manhour_absence = 0
+        # hours carried from the absence of last month, required in addition to the job
+        self.manhour_carried = 0
+
+    def fork(self):
+        """
+        Copy of this schedule to adjust and re-schedule without touching it, see Month.fork().
+
+        :return: Schedule object
+        """
+        result = Schedule(self.job, self.month.fork())
+        result.checkin_manhour = self.checkin_manhour
+        result.manhour_remain = self.manhour_remain
+        result.overhours = self.overhours
+        result.manhour_absence = self.manhour_absence
+        result.manhour_carried = self.manhour_carried
+        return result
 
     @property
     def dayoff_list(self):
@@ -203,92 +635,67 @@ class Schedule:
         for day in dayoff_days:
             day.dayoff()
         for day in onduty_days:
-            day.is_dayoff = False
-
-    @classmethod
-    def __sort_day(cls, days):
-        return sorted(days, key=lambda day: day.date)
+            day.onduty()
 
     def __calculate_manhour_remain(self):
-        days_past = set(filter(lambda day: day.is_past, self.month.days))
-        days_remain = set(self.month.days) - days_past
-        workdays_remain = set(filter(lambda day: not day.is_dayoff, days_remain))
-        dayoff_remain = days_remain - workdays_remain
-
-        if len(days_past) > 0:
-            self.checkin_manhour = reduce(lambda a, b: a + b, [dec_float(day.checkin_manhour) for day in days_past])
-            self.overhours = reduce(lambda a, b: a + b, [dec_float(day.overtime) for day in days_past])
+        month = self.month
+        if month.past_count > 0:
+            self.checkin_manhour = month.past_checkin
+            self.overhours = month.past_overtime
         else:
             self.checkin_manhour = 0
             self.overhours = 0
-        delta_manhour_remain = dec_float(self.job.required_manhour) - self.checkin_manhour
+        required_manhour = dec_float(self.job.required_manhour)
+        if self.manhour_carried:
+            required_manhour += dec_float(self.manhour_carried)
+        delta_manhour_remain = required_manhour - self.checkin_manhour
         self.manhour_remain = delta_manhour_remain if delta_manhour_remain > 0 else 0
-        return self.__sort_day(workdays_remain), self.__sort_day(dayoff_remain), self.manhour_remain
-
-    def __ceil_workhour_by_precision(self, workhour: Decimal, precision: Decimal):
-        """
-        make schedule time "ceil" to precision, only if it's not beyond the max overtime
-
-        :param workhour:
-        :param precision:
-        :return: Decimal type
-        """
-        if precision > 0:
-            if workhour % precision:
-                pre_schedule_hours = (workhour // precision + 1) * precision
-            else:
-                pre_schedule_hours = workhour
-        else:
-            pre_schedule_hours = workhour
-
-        max_daily_work_hours = dec_float(self.job.daily_work_hours) + dec_float(self.job.max_daily_overhours)
-        pre_schedule_hours = max_daily_work_hours \
-            if pre_schedule_hours > max_daily_work_hours else pre_schedule_hours
-
-        return pre_schedule_hours
+        return self.manhour_remain
 
     def schedule(self, precision=1):
         """
         Update schedule time of workdays remaining.
+        Hours are figured out in integer units by the fixed-point engine and written into the month's columns,
+        each step is explained from those units while log.VERBOSE is set or instrumentation is enabled.
 
         :param precision: minimum time unit to calculate the schedule time, default to 1 hour
         (eg. 0.25 means 15 mins). 0 means no limit.
         :return:
         """
-        workdays_remain, dayoff_remain, manhour_remain = self.__calculate_manhour_remain()
-        workdays_count = len(workdays_remain)
-
-        log('workdays remaining:', workdays_count)
-        for day in workdays_remain:
-
-            log('date:', day.date, "\t manhour_remain:", manhour_remain)
-            dec_daily_work_hours = dec_float(self.job.daily_work_hours)
-            if manhour_remain > dec_daily_work_hours:
-                avg_manhour_remain = Decimal(manhour_remain / workdays_count).quantize(Decimal('1.00'))
-                workdays_count -= 1
-                if avg_manhour_remain > dec_daily_work_hours:
-                    schedule_hours = self.__ceil_workhour_by_precision(avg_manhour_remain, dec_float(precision))
-                else:
-                    schedule_hours = dec_daily_work_hours
-                log('daily_avg_manhour_remain:', avg_manhour_remain)
-            else:
-                schedule_hours = dec_daily_work_hours
-
-            day.schedule(float(schedule_hours))
-            if schedule_hours > dec_daily_work_hours:
-                day.overtime = float(schedule_hours - dec_daily_work_hours)
-            else:
-                day.overtime = 0
-
+        with span('schedule', year=self.month.index['year'], month=self.month.index['month'], precision=precision):
+            self.__schedule_units(self.__calculate_manhour_remain(), precision)
+
+    def __schedule_units(self, manhour_remain, precision):
+        from mhcalendar.engine import distribute_units, to_units
+        workdays, dayoff = self.month._remain_indexes()
+        units, remain, places = distribute_units(manhour_remain, len(workdays), self.job.daily_work_hours,
+                                                 self.job.max_daily_overhours, precision)
+        scale = 10 ** places
+        columns = self.month.columns
+        columns.schedule_units(workdays, units, to_units(self.job.daily_work_hours, places), scale)
+        columns.clear_hours(dayoff)
+        self.manhour_absence = remain / scale if remain > 0 else 0
+
+        if mhcalendar.log.VERBOSE:
+            for line in self.__steps(workdays, units, places, manhour_remain):
+                log(line)
+        event('schedule.steps', lambda: '\n'.join(self.__steps(workdays, units, places, manhour_remain)),
+              workdays=len(workdays))
+
+    def __steps(self, workdays, units, places, manhour_remain):
+        """
+        :param workdays: indexes of the workdays scheduled
+        :param units: units scheduled into each of them, given by the engine
+        :return: generator of lines explaining the hours scheduled and remaining after each workday
+        """
+        from mhcalendar.engine import to_hours
+        yield 'workdays remaining: {}'.format(len(workdays))
+        ordinals = self.month.columns.ordinals
+        for index, unit in zip(workdays, units):
+            schedule_hours = to_hours(unit, places)
+            yield 'date: {0} \t manhour_remain: {1}'.format(date.fromordinal(ordinals[index]), manhour_remain)
             manhour_remain -= schedule_hours
-
-            log("schedule_hours:", schedule_hours, "\t manhour_remain:", manhour_remain, '\n')
-
-        for day in dayoff_remain:
-            day.schedule(0)
-            day.overtime = 0
-
-        self.manhour_absence = float(manhour_remain) if manhour_remain > 0 else 0
+            yield 'schedule_hours: {0} \t manhour_remain: {1}\n'.format(schedule_hours, manhour_remain)
 
 
 def timezone_date(tz=+9, area='Tokyo'):
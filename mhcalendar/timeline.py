@@ -0,0 +1,162 @@
+"""
+Schedules of one job across many months.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from mhcalendar.job import Job
+from mhcalendar.time_elements import Month, Schedule
+
+MonthSummary = namedtuple('MonthSummary',
+                          ('checkin_manhour', 'overhours', 'manhour_absence', 'manhour_carried'))
+
+
+def next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def month_range(start, end):
+    """
+    :param start: (year, month)
+    :param end: (year, month), inclusive
+    :return: generator of (year, month)
+    """
+    key = tuple(start)
+    while key <= tuple(end):
+        yield key
+        key = next_month(*key)
+
+
+class Timeline:
+    """
+    Keep months of a job since start, each month is loaded or created at the first access,
+    and its summary is kept until it changes.
+    Hours can not be scheduled in a month are carried forward to the next month.
+    """
+
+    def __init__(self, job: Job, start, store=None, precision=1, carry_absence=True, carried=None):
+        """
+        :param start: (year, month) of the first month
+        :param store: ScheduleStore to load and save months, None to keep them in memory only
+        :param precision: same as Schedule.schedule()
+        :param carry_absence: if carry manhour_absence forward to the next month
+        :param carried: hours carried into the first month, default to the ones saved in store, see save()
+        """
+        self.job = job
+        self.start = tuple(start)
+        self.store = store
+        self.precision = precision
+        self.carry_absence = carry_absence
+        if carried is None:
+            carried = self.__carried_in_store()
+        self.carried = carried
+        self.__months = {}
+        self.__summaries = {}
+
+    def month(self, year, month):
+        """
+        :return: Month object, loaded from store or created if it is never processed
+        """
+        key = (year, month)
+        if key < self.start:
+            raise ValueError("Month {0}.{1} is before the start of timeline.".format(year, month))
+        result = self.__months.get(key)
+        if result is None:
+            result = self.store and self.store.load_month(year, month) or Month(year, month)
+            self.__months[key] = result
+        return result
+
+    def schedule(self, year, month):
+        """
+        Schedule the month with the hours carried from last month.
+
+        :return: Schedule object
+        """
+        schedule = Schedule(self.job, self.month(year, month))
+        if self.carry_absence:
+            schedule.manhour_carried = self.carried if (year, month) == self.start \
+                else self.summary(*self.__last_month(year, month)).manhour_absence
+        schedule.schedule(self.precision)
+        self.__summaries[(year, month)] = MonthSummary(schedule.checkin_manhour, schedule.overhours,
+                                                       schedule.manhour_absence, schedule.manhour_carried)
+        return schedule
+
+    def summary(self, year, month):
+        """
+        :return: MonthSummary of the month
+        """
+        summary = self.__summaries.get((year, month))
+        if summary is None:
+            self.schedule(year, month)
+            summary = self.__summaries[(year, month)]
+        return summary
+
+    def changed(self, year, month):
+        """
+        Drop summaries from the month on, call it after days of the month are changed.
+        """
+        for key in list(self.__summaries):
+            if key >= (year, month):
+                del self.__summaries[key]
+
+    def total(self, start, end):
+        """
+        Sum up summaries of months from start to end (inclusive).
+
+        :param start: (year, month)
+        :param end: (year, month)
+        :return: MonthSummary, manhour_carried is the hours carried into start
+        """
+        checkin, overhours, absence = Decimal(0), Decimal(0), Decimal(0)
+        carried = None
+        for key in month_range(start, end):
+            summary = self.summary(*key)
+            carried = summary.manhour_carried if carried is None else carried
+            checkin += Decimal(summary.checkin_manhour)
+            overhours += Decimal(summary.overhours)
+            if self.carry_absence:
+                # absence is carried forward, what is left of all of them is the absence of the last month
+                absence = Decimal(str(summary.manhour_absence))
+            else:
+                absence += Decimal(str(summary.manhour_absence))
+        return MonthSummary(checkin, overhours, absence, carried or 0)
+
+    def quarter(self, year, quarter):
+        """
+        :param quarter: 1 to 4
+        :return: MonthSummary of the quarter, see total()
+        """
+        first = (quarter - 1) * 3 + 1
+        return self.total((year, first), (year, first + 2))
+
+    def save(self):
+        """
+        Save every month loaded into store, the hours carried into the first month,
+        and the schedule of the last month as the head of store, with the hours carried into it.
+        """
+        if self.store is None:
+            raise ValueError("Timeline has no store to save into.")
+        for month in self.__months.values():
+            self.store.save_month(month)
+        self.store.save_carried(self.start[0], self.start[1], self.carried)
+        if self.__months:
+            self.store.save_head(self.schedule(*max(self.__months)))
+
+    def __carried_in_store(self):
+        """
+        :return: hours carried into the first month saved in store,
+                 or the ones of its head if the head is at that month, otherwise 0
+        """
+        if self.store is None:
+            return 0
+        carried = self.store.load_carried(*self.start)
+        if carried is not None:
+            return carried
+        schedule = self.store.exists() and self.store.load()
+        if schedule and (schedule.month.index['year'], schedule.month.index['month']) == self.start:
+            return schedule.manhour_carried
+        return 0
+
+    @classmethod
+    def __last_month(cls, year, month):
+        return (year - 1, 12) if month == 1 else (year, month - 1)
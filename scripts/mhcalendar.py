@@ -13,10 +13,12 @@ Usage:
     mhcalendar (-j | --job)
     mhcalendar (-M | --Month) <year> <month>
     mhcalendar (-m | --month)
+    mhcalendar serve
     mhcalendar [-v | --verbose] [-C | --calendar] [--pre <precision>]
     mhcalendar (-c | --checkin) [<hours>]
     mhcalendar (-p | --pointer)
     mhcalendar --dayoff [--] [<date> ...]
+    mhcalendar --profile-startup [--budget <ms>]
 
 
 Options:
@@ -33,6 +35,11 @@ Options:
     -p, --pointer     Show the date which is pointing to.
                       It will shift to next day after you check in the man-hour.
     --dayoff          Schedule the dates to day off or reverse.
+    --profile-startup
+                      Show where the startup time goes, by drawing the calendar without output.
+    --budget          Exit with status 1 if the startup takes more than <ms> milliseconds.
+    serve             Run as a daemon keeping the schedule in memory, other commands will be
+                      served by it while it is running. (Unix only)
 
 
 Parameter:
@@ -68,92 +75,137 @@ Simple Workflow:
 
 
 """
-from docopt import docopt
+import os
+import sys
+import time
 
 import meta
-import mhcalendar.log as log
-import mhcalendar.time_elements as te
-from mhcalendar import io
-from mhcalendar.job import Job
+
+
+class StartupProfile:
+    """
+    Record time of each startup phase.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.__start = time.perf_counter()
+
+    def phase(self, name):
+        """
+        Close the current phase with name, and start the next one.
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self.__start))
+        self.__start = now
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self):
+        for name, seconds in self.phases:
+            print('{0:<20}{1:>8.2f} ms'.format(name, seconds * 1000))
+        print('{0:<20}{1:>8.2f} ms'.format('total', self.total * 1000))
+
+
+profile = StartupProfile()
 
 
 def main():
+    from docopt import docopt
+    profile.phase('import docopt')
     arguments = docopt(__doc__, version=meta.VERSION)
-    io.prepare()
+    profile.phase('parse arguments')
+
+    import mhcalendar.log as log
+    from mhcalendar import io
+    profile.phase('import mhcalendar')
+    if os.environ.get('MHCALENDAR_TRACE'):
+        log.add_sink(log.StderrSink())
+
+    io.prepare(schedule=False)
+    profile.phase('prepare')
     log.VERBOSE = arguments['--verbose']
-    if arguments['--Job']:
-        job = Job(float(arguments['<required_manhour>']), float(arguments['<daily_work_hours>']),
-                  float(arguments['<hourly_pay>']), float(arguments['<max_daily_overhours>']))
-        schedule = io.Cache.restore_schedule()
-        schedule.job = job
-        io.Cache.cache_schedule(schedule)
+
+    if arguments['--profile-startup']:
+        profile_startup(io, arguments['<ms>'])
         return
-    if arguments['--job']:
-        schedule = io.Cache.restore_schedule()
-        check_schedule(schedule)
-        print(schedule.job)
+    if arguments['serve']:
+        from mhcalendar import daemon
+        daemon.serve()
         return
-    if arguments['--Month']:
-        schedule = io.Cache.restore_schedule()
-        month = te.Month(int(arguments['<year>']), int(arguments['<month>']))
-        schedule.month = month
-        io.Cache.cache_schedule(schedule)
+
+    if arguments['--Job']:
+        command, args = 'set_job', {name: arguments['<{}>'.format(name)] for name in (
+            'required_manhour', 'daily_work_hours', 'hourly_pay', 'max_daily_overhours')}
+    elif arguments['--job']:
+        command, args = 'show_job', {}
+    elif arguments['--Month']:
+        command, args = 'set_month', {'year': arguments['<year>'], 'month': arguments['<month>']}
+    elif arguments['--month']:
+        command, args = 'show_month', {}
+    elif arguments['--checkin']:
+        command, args = 'checkin', {'hours': arguments['<hours>']}
+    elif arguments['--pointer']:
+        command, args = 'pointer', {}
+    elif arguments['--dayoff']:
+        command, args = 'dayoff', {'dates': arguments['<date>']}
+    else:
+        # default to show calendar
+        command, args = 'calendar', {'precision': arguments['<precision>'] or 1}
+    execute(io, command, args)
+
+
+def execute(io, command, args):
+    """
+    Execute command by the daemon if it is running, otherwise on the schedule cache.
+    """
+    from mhcalendar import commands, daemon
+
+    response = daemon.request(command, **args)
+    if response is not None:
+        print(response['output'], end='')
+        if response['error']:
+            raise Exception(response['error'])
         return
-    if arguments['--month']:
-        schedule = io.Cache.restore_schedule()
-        print('Month: ', schedule.month.index['year'], '.', schedule.month.index['month'], sep='')
+
+    func = getattr(commands, command)
+    if not commands.COMMANDS[command]:
+        func(io.load_schedule(), **args)
         return
-    if arguments['--checkin']:
-        schedule = io.Cache.restore_schedule()
-        check_schedule(schedule)
-        manhour = arguments['<hours>']
-        day_to_checkin = schedule.month.next_day
-        if not day_to_checkin:
-            raise Exception()
-        if manhour:
-            day_to_checkin.checkin(float(manhour))
+    with io.Cache.lock():
+        schedule = io.load_schedule()
+        result = func(schedule, **args)
+        if command == 'checkin':
+            io.Cache.cache_day(schedule, result)
         else:
-            day_to_checkin.checkin()
-        io.Cache.cache_schedule(schedule)
-        print("Date: {0}.{1}.{2} {3} \t Check in hours: {4}".format(day_to_checkin.date.year, day_to_checkin.date.month,
-                                                                    day_to_checkin.date.day,
-                                                                    day_to_checkin.date.strftime('%A'),
-                                                                    day_to_checkin.checkin_manhour))
-        return
-    if arguments['--pointer']:
-        schedule = io.Cache.restore_schedule()
-        check_schedule(schedule)
-        print(schedule.month.next_day)
-        return
-    if arguments['--dayoff']:
-        schedule = io.Cache.restore_schedule()
-        check_schedule(schedule)
-        dates = arguments['<date>']
+            io.Cache.cache_schedule(schedule)
 
-        if not dates or len(dates) == 0:
-            dates = [-schedule.month.next_day.date.day]
 
-        schedule.adjust(day_off=dates)
-        io.Cache.cache_schedule(schedule)
-        return
+def profile_startup(io, budget=None):
+    """
+    Go through the default command without writing cache and output, then report time of each phase.
 
-    # default to show calendar
-    schedule_precision = arguments['<precision>'] or 1
-    schedule = io.Cache.restore_schedule()
-    check_schedule(schedule)
-
-    schedule.schedule(schedule_precision)
-    io.MHCalendarDrawer().draw(schedule)
-    io.Cache.cache_schedule(schedule)
+    :param budget: exit with status 1 if total time exceeds budget milliseconds
+    """
+    from contextlib import redirect_stdout
+    from io import StringIO
 
+    from mhcalendar.commands import check_schedule
 
-def check_schedule(schedule):
-    if not schedule:
-        raise Exception("Initialize error. Try again.")
-    if not schedule.job:
-        raise Exception("You haven't create your Job file yet.")
-    if not schedule.month.next_day:
-        raise Exception("This month's schedule is completed already.\nUpdate your Month data for next schedule.")
+    schedule = io.Cache.restore_schedule()
+    profile.phase('restore schedule')
+    check_schedule(schedule)
+    schedule.schedule()
+    profile.phase('schedule')
+    with redirect_stdout(StringIO()):
+        io.MHCalendarDrawer().draw(schedule)
+    profile.phase('draw')
+
+    profile.report()
+    if budget is not None and profile.total * 1000 > float(budget):
+        sys.exit("Startup takes {0:.2f} ms, exceeds the budget of {1} ms.".format(profile.total * 1000, budget))
 
 
 if __name__ == '__main__':
@@ -22,7 +22,7 @@ setup(
     license='MIT',
     keywords=['man-hour', 'manhour', 'man hour', 'calendar', 'schedule'],
     python_requires='>=3',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'tests']),
     py_modules=['meta'],
     install_requires=['docopt>=0.6.2'],
     classifiers=[
@@ -0,0 +1,72 @@
+"""
+Requests to the daemon over its Unix domain socket.
+"""
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import mhcalendar.io as io
+from mhcalendar import daemon
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix domain socket is not supported")
+class RequestTest(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.config_dir.cleanup)
+        for patcher in (mock.patch.object(io, 'CONFIG_DIR', self.config_dir.name),
+                        mock.patch.object(daemon, 'TIMEOUT', 0.2)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def serve(self, reply):
+        """
+        Accept one connection, read the request and answer it by reply, or never answer if reply is None.
+        """
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(daemon.socket_path())
+        server.listen(1)
+        self.addCleanup(server.close)
+        done = threading.Event()
+        self.addCleanup(done.set)
+
+        def answer():
+            client, _ = server.accept()
+            with client:
+                client.makefile('rb').readline()
+                if reply is None:
+                    done.wait(5)
+                else:
+                    client.sendall(reply)
+
+        threading.Thread(target=answer, daemon=True).start()
+
+    def test_no_socket(self):
+        self.assertIsNone(daemon.request('show_month'))
+        self.assertFalse(daemon.running())
+
+    def test_socket_left_by_daemon_gone(self):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(daemon.socket_path())
+        server.close()
+        self.assertIsNone(daemon.request('show_month'))
+
+    def test_response(self):
+        self.serve(b'{"output": "Month: 2017.10\\n", "error": null}\n')
+        self.assertEqual(daemon.request('show_month'), {'output': 'Month: 2017.10\n', 'error': None})
+
+    def test_timeout_is_not_taken_as_stopped(self):
+        self.serve(None)
+        with self.assertRaises(daemon.DaemonError):
+            daemon.request('checkin', hours=8)
+
+    def test_bad_response(self):
+        self.serve(b'')
+        with self.assertRaises(daemon.DaemonError):
+            daemon.running()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Equivalence of the fixed-point engine and the Decimal loop which Schedule.schedule() used before it.
+"""
+import random
+import unittest
+from decimal import Decimal
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import mhcalendar.log
+from mhcalendar import engine
+from mhcalendar.job import Job
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+PRECISIONS = (0, 0.25, 0.5, 1, 2)
+REQUIRED = (0, 8, 60, 120, 140.5, 160, 180, 233.33, 300)
+DAILY = (7, 7.5, 8)
+OVERHOURS = (0, 0.75, 2, 3.5)
+CHECKINS = (0, 4, 7.5, 8, 9.25, 10)
+
+
+def old_loop(manhour_remain, workdays_count, daily_work_hours, max_daily_overhours, precision):
+    """
+    The per-day Decimal loop of Schedule.schedule() before the engine, kept as the reference.
+    """
+    daily = dec_float(daily_work_hours)
+    max_daily = daily + dec_float(max_daily_overhours)
+    precision = dec_float(precision)
+    remain = manhour_remain
+    count = workdays_count
+    hours = []
+    for _ in range(workdays_count):
+        if remain > daily:
+            avg = Decimal(remain / count).quantize(Decimal('1.00'))
+            count -= 1
+            if avg > daily:
+                schedule_hours = avg
+                if precision > 0 and avg % precision:
+                    schedule_hours = (avg // precision + 1) * precision
+                schedule_hours = max_daily if schedule_hours > max_daily else schedule_hours
+            else:
+                schedule_hours = daily
+        else:
+            schedule_hours = daily
+        hours.append(schedule_hours)
+        remain -= schedule_hours
+    return hours, remain
+
+
+def random_case(rnd):
+    """
+    :return: (job, month, precision), month has some days taken off and a random prefix of days checked in
+    """
+    job = Job(rnd.choice(REQUIRED), rnd.choice(DAILY), 2000, rnd.choice(OVERHOURS))
+    month = Month(rnd.randint(2000, 2030), rnd.randint(1, 12), [])
+    for day in rnd.sample(month.days, rnd.randint(0, 5)):
+        day.dayoff()
+    for day in month.days[:rnd.randint(0, len(month.days))]:
+        day.checkin(0 if day.is_dayoff else rnd.choice(CHECKINS))
+    return job, month, rnd.choice(PRECISIONS)
+
+
+def remain_of(job, month):
+    """
+    :return: (manhour_remain, workdays_count) as the old Schedule figured them out from the days
+    """
+    checkin = sum((dec_float(day.checkin_manhour) for day in month.days if day.is_past), Decimal(0))
+    remain = dec_float(job.required_manhour) - checkin
+    workdays = [day for day in month.days if not day.is_past and not day.is_dayoff]
+    return (remain if remain > 0 else Decimal(0)), len(workdays)
+
+
+class DistributeTest(unittest.TestCase):
+    CASES = 2000
+
+    def cases(self):
+        rnd = random.Random(20171004)
+        for _ in range(self.CASES):
+            job, month, precision = random_case(rnd)
+            remain, count = remain_of(job, month)
+            yield job, remain, count, precision
+
+    def test_distribute_equals_old_loop(self):
+        for job, remain, count, precision in self.cases():
+            args = (remain, count, job.daily_work_hours, job.max_daily_overhours, precision)
+            self.assertEqual(engine.distribute(*args), old_loop(*args), args)
+
+    def __check_many(self):
+        by_job = {}
+        for job, remain, count, precision in self.cases():
+            key = (job.daily_work_hours, job.max_daily_overhours, precision)
+            by_job.setdefault(key, []).append((remain, count))
+        for (daily, overhours, precision), scenarios in by_job.items():
+            rows, remains = engine.distribute_many([s[0] for s in scenarios], [s[1] for s in scenarios],
+                                                   daily, overhours, precision)
+            expected = [old_loop(remain, count, daily, overhours, precision) for remain, count in scenarios]
+            self.assertEqual(rows, [e[0] for e in expected])
+            self.assertEqual(remains, [e[1] for e in expected])
+
+    @unittest.skipIf(engine._numpy() is None, "NumPy is not installed")
+    def test_distribute_many_by_numpy_equals_old_loop(self):
+        self.__check_many()
+
+    def test_distribute_many_without_numpy_equals_old_loop(self):
+        with mock.patch.object(engine, '_numpy', return_value=None):
+            self.__check_many()
+
+    def test_distribute_many_of_long_decimals(self):
+        # units of such a number do not fit in int64, NumPy is not used for it
+        remains = [Decimal('160.30000000000000004'), Decimal('80.5')]
+        rows, remains_left = engine.distribute_many(remains, [20, 10], 8, 2, 0.25)
+        expected = [old_loop(remain, count, 8, 2, 0.25) for remain, count in zip(remains, [20, 10])]
+        self.assertEqual(rows, [e[0] for e in expected])
+        self.assertEqual(remains_left, [e[1] for e in expected])
+
+    def test_schedule_equals_old_loop(self):
+        rnd = random.Random(20171005)
+        for _ in range(500):
+            job, month, precision = random_case(rnd)
+            remain, count = remain_of(job, month)
+            hours, rest = old_loop(remain, count, job.daily_work_hours, job.max_daily_overhours, precision)
+            schedule = Schedule(job, month)
+            schedule.schedule(precision)
+            workdays = [day for day in month.days if not day.is_past and not day.is_dayoff]
+            self.assertEqual([dec_float(day.scheduled_work_hours) for day in workdays], hours)
+            self.assertEqual(schedule.manhour_absence, float(rest) if rest > 0 else 0)
+            daily = dec_float(job.daily_work_hours)
+            self.assertEqual([dec_float(day.overtime) for day in workdays],
+                             [h - daily if h > daily else 0 for h in hours])
+
+
+class VerboseTest(unittest.TestCase):
+    """
+    Steps are explained from the units of the engine, the hours scheduled are the same with or without it.
+    """
+
+    def schedule(self):
+        schedule = Schedule(Job(160, 8, 2000, 2), Month(2017, 10, []))
+        for day in schedule.month.days[:3]:
+            day.checkin(0 if day.is_dayoff else 9.5)
+        return schedule
+
+    def test_verbose_schedules_the_same(self):
+        quiet = self.schedule()
+        quiet.schedule(0.25)
+        verbose = self.schedule()
+        output = StringIO()
+        with mock.patch.object(mhcalendar.log, 'VERBOSE', True), redirect_stdout(output):
+            verbose.schedule(0.25)
+        self.assertEqual([(d.scheduled_work_hours, d.overtime) for d in verbose.month.days],
+                         [(d.scheduled_work_hours, d.overtime) for d in quiet.month.days])
+
+        lines = output.getvalue().splitlines()
+        workdays = quiet.month.workdays_remain
+        self.assertEqual(lines[0], 'workdays remaining: {}'.format(len(workdays)))
+        scheduled = [line.split()[1] for line in lines if line.startswith('schedule_hours:')]
+        self.assertEqual([Decimal(h) for h in scheduled], [dec_float(d.scheduled_work_hours) for d in workdays])
+        self.assertEqual(Decimal(lines[-2].split()[-1]),
+                         dec_float(quiet.job.required_manhour) - quiet.checkin_manhour - sum(map(Decimal, scheduled)))
+
+    def test_steps_event_is_lazy(self):
+        with mock.patch.object(Schedule, '_Schedule__steps') as steps:
+            self.schedule().schedule()
+        steps.assert_not_called()
+
+        sink = mhcalendar.log.MemorySink()
+        mhcalendar.log.add_sink(sink)
+        try:
+            self.schedule().schedule()
+        finally:
+            mhcalendar.log.remove_sink(sink)
+        record = [r for r in sink.records if r['event'] == 'schedule.steps'][0]
+        self.assertTrue(record['message'].startswith('workdays remaining: '))
+
+
+if __name__ == '__main__':
+    unittest.main()
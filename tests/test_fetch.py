@@ -0,0 +1,191 @@
+"""
+Fetching holidays of many years, and revalidating holiday cache.
+"""
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import mhcalendar.holiday as holiday_index
+import mhcalendar.io as io
+from mhcalendar import fetch
+from mhcalendar.holiday import CalendarService, JapaneseHolidays
+
+URL = 'http://127.0.0.1/cal?start_year={start_year}&end_year={end_year}'
+
+
+def csv_of(year):
+    lines = ['year,month,day,gengo,wareki_year,weekday,weekday_number,holiday_name']
+    lines.extend(','.join(holiday) for holiday in JapaneseHolidays().holidays(year, year))
+    return '\n'.join(lines).encode('EUC-JP') + b'\n'
+
+
+class StubService(fetch.AsyncCalendarService):
+    """
+    Answer each year by the body given, without network.
+    """
+
+    def __init__(self, bodies):
+        super().__init__(URL, retries=0)
+        self.bodies = bodies
+        self.lock_depths = []
+
+    def _request(self, url, validator):
+        self.lock_depths.append(io.Cache._lock_depth)
+        year = int(url.rsplit('=', 1)[1])
+        return 200, self.bodies[year], {'etag': '"{}"'.format(year), 'last_modified': None}
+
+
+class FetchTest(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.config_dir.cleanup)
+        patcher = mock.patch.object(io, 'CONFIG_DIR', self.config_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(holiday_index.invalidate)
+        self.stale = [h._replace(name='stale') for h in JapaneseHolidays().holidays(2016, 2017)]
+        io.Cache.cache_holidays(self.stale)
+
+    def test_broken_body_keeps_stale_year(self):
+        provider = StubService({2016: b'year,month\n2016,1\n', 2017: b'\xff\xff\xff\n', 2018: csv_of(2018)})
+        with mock.patch('sys.stdout'):
+            holiday_index.prefetch(2016, 2018, provider)
+        cached = io.Cache.restore_holidays()
+        self.assertEqual([h for h in cached if h.year in ('2016', '2017')], self.stale)
+        self.assertEqual([h for h in cached if h.year == '2018'], JapaneseHolidays().holidays(2018, 2018))
+        self.assertEqual(list(io.Cache.restore_validators()), [URL.format(start_year=2018, end_year=2018)])
+
+    def test_all_broken_fails(self):
+        provider = StubService({2017: b'\xff\xff\xff\n'})
+        with mock.patch('sys.stdout'):
+            self.assertIsNone(provider.holidays(2017, 2017))
+        self.assertEqual(io.Cache.restore_holidays(), self.stale)
+
+    def test_fetch_without_lock(self):
+        provider = StubService({2018: csv_of(2018)})
+        with mock.patch.object(fetch, 'AsyncCalendarService', return_value=provider), mock.patch('sys.stdout'):
+            fetch.main(['2018', '2018', self.config_dir.name, URL])
+        self.assertEqual(provider.lock_depths, [0])
+        self.assertTrue(holiday_index.has_year(2018))
+
+    def test_prepare_revalidates_network_provider(self):
+        with mock.patch.object(fetch, 'revalidate') as revalidate:
+            io.prepare(CalendarService(URL, timeout=3), schedule=False)
+        provider = revalidate.call_args[0][2]
+        self.assertIsInstance(provider, fetch.AsyncCalendarService)
+        self.assertEqual((provider.url, provider.timeout), (URL, 3))
+
+    def test_prepare_offline_provider(self):
+        with mock.patch.object(fetch, 'revalidate') as revalidate:
+            io.prepare(schedule=False)
+        revalidate.assert_not_called()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answer requests in the same CSV as calendar-service.net, with holidays computed offline.
+    The ETag of a response is its year, a request with the same ETag is answered by 304.
+    """
+
+    def do_GET(self):
+        server = self.server
+        if server.failures > 0:
+            server.failures -= 1
+            server.statuses.append(503)
+            self.send_error(503)
+            return
+        year = int(parse_qs(urlparse(self.path).query)['start_year'][0])
+        etag = '"{}"'.format(year)
+        if self.headers.get('If-None-Match') == etag:
+            server.statuses.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = csv_of(year)
+        server.statuses.append(200)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.config_dir.cleanup)
+        patcher = mock.patch.object(io, 'CONFIG_DIR', self.config_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(holiday_index.invalidate)
+
+        self.server = HTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.failures = 0
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = 'http://127.0.0.1:{0}/cal?start_year={{start_year}}&end_year={{end_year}}'.format(
+            self.server.server_port)
+        self.provider = fetch.AsyncCalendarService(self.url, timeout=2, backoff=0.01, concurrency=1)
+
+    def test_server_errors_are_retried(self):
+        self.server.failures = 2
+        with mock.patch('sys.stdout'):
+            holidays = self.provider.holidays(2017, 2017)
+        self.assertEqual(holidays, JapaneseHolidays().holidays(2017, 2017))
+        self.assertEqual(self.server.statuses, [503, 503, 200])
+
+    def test_too_many_server_errors_fail(self):
+        self.server.failures = 4
+        with mock.patch('sys.stdout'):
+            self.assertIsNone(self.provider.holidays(2017, 2017))
+        self.assertEqual(self.server.statuses, [503] * 4)
+
+    def test_not_modified_years_are_taken_from_cache(self):
+        with mock.patch('sys.stdout'):
+            holiday_index.prefetch(2016, 2017, self.provider)
+            del self.server.statuses[:]
+            holidays = self.provider.holidays(2016, 2017)
+        self.assertEqual(self.server.statuses, [304, 304])
+        self.assertEqual(holidays, JapaneseHolidays().holidays(2016, 2017))
+
+    def test_revalidate_never_waits_for_missing_years(self):
+        with mock.patch('subprocess.Popen') as popen:
+            self.assertTrue(fetch.revalidate(2017, 2017, self.provider))
+        self.assertEqual(self.server.statuses, [])
+        self.assertEqual(popen.call_args[0][0][-4:], ['2017', '2017', self.config_dir.name, self.url])
+        # served offline until the detached process fetches them
+        self.assertEqual(holiday_index.lookup(date(2017, 1, 1)).name, '元日')
+
+    def test_revalidate_is_not_started_again_while_it_has_not_succeeded(self):
+        with mock.patch('subprocess.Popen') as popen:
+            fetch.revalidate(2017, 2017, self.provider)
+            self.assertFalse(fetch.revalidate(2017, 2017, self.provider))
+            self.assertEqual(popen.call_count, 1)
+
+            with mock.patch('time.time', return_value=time.time() + fetch.RETRY_AFTER + 1):
+                self.assertTrue(fetch.revalidate(2017, 2017, self.provider))
+            self.assertEqual(popen.call_count, 2)
+
+    def test_revalidate_after_success(self):
+        with mock.patch('sys.stdout'):
+            fetch.main(['2017', '2017', self.config_dir.name, self.url])
+        with mock.patch('subprocess.Popen') as popen:
+            self.assertFalse(fetch.revalidate(2017, 2017, self.provider))
+            with mock.patch('time.time', return_value=time.time() + fetch.MAX_AGE + 1):
+                self.assertTrue(fetch.revalidate(2017, 2017, self.provider))
+        self.assertEqual(popen.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
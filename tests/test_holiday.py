@@ -0,0 +1,70 @@
+"""
+Process-wide holiday index.
+"""
+import unittest
+from datetime import date
+from unittest import mock
+
+import mhcalendar.holiday as holiday_index
+from mhcalendar import batch
+from mhcalendar.holiday import JapaneseHolidays
+from mhcalendar.job import Job
+from mhcalendar.table import HolidayTable, build
+from mhcalendar.time_elements import Month
+
+
+class IndexTest(unittest.TestCase):
+    def tearDown(self):
+        holiday_index.invalidate()
+
+    def test_cached_years_are_used(self):
+        renamed = [h._replace(name='cached') for h in JapaneseHolidays().holidays(2017, 2017)]
+        holiday_index.load(renamed)
+        self.assertEqual(holiday_index.lookup(date(2017, 1, 1)).name, 'cached')
+
+    def test_missing_years_are_computed_offline(self):
+        holiday_index.load(JapaneseHolidays().holidays(2017, 2017))
+        self.assertFalse(holiday_index.has_year(2027))
+        self.assertEqual(holiday_index.lookup(date(2027, 1, 1)).name, '元日')
+        month = Month(2027, 1)
+        self.assertEqual([h.name for h in month.holidays], ['元日', '成人の日'])
+        self.assertEqual(len(month.workdays_remain), 19)
+
+    def test_years_out_of_offline_range(self):
+        holiday_index.load([])
+        self.assertEqual(holiday_index.holidays_of_year(JapaneseHolidays.LAST_YEAR + 1), {})
+
+
+class TableTest(unittest.TestCase):
+    def setUp(self):
+        self.holidays = JapaneseHolidays().holidays(2016, 2018)
+        self.table = HolidayTable(build(self.holidays))
+        self.addCleanup(holiday_index.invalidate)
+
+    def test_months_read_the_table_directly(self):
+        holiday_index.load(self.holidays)
+        expected = [Month(2017, mon) for mon in range(1, 13)]
+        holiday_index.use_table(self.table)
+        with mock.patch.object(self.table, 'holidays_of_year', side_effect=AssertionError):
+            months = [Month(2017, mon) for mon in range(1, 13)]
+            self.assertEqual(holiday_index.lookup(date(2017, 9, 18)).name, '敬老の日')
+            self.assertIsNone(holiday_index.lookup(date(2017, 9, 19)))
+        self.assertEqual([(m.holidays, [d.is_dayoff for d in m.days]) for m in months],
+                         [(m.holidays, [d.is_dayoff for d in m.days]) for m in expected])
+
+    def test_years_out_of_table_are_computed_offline(self):
+        holiday_index.use_table(self.table)
+        self.assertEqual(holiday_index.lookup(date(2027, 1, 1)).name, '元日')
+        self.assertEqual([h.name for h in Month(2027, 1).holidays], ['元日', '成人の日'])
+
+    def test_run_in_process_keeps_index(self):
+        renamed = [h._replace(name='loaded') for h in self.holidays]
+        holiday_index.load(renamed)
+        schedules = batch.schedule_all([(Job(160, 8, 2000, 2), (2017, 1))], processes=1)
+        self.assertEqual(schedules[0].month.holidays[0].name, 'loaded')
+        self.assertIsNone(holiday_index._table)
+        self.assertEqual(holiday_index.lookup(date(2017, 1, 1)).name, 'loaded')
+
+
+if __name__ == '__main__':
+    unittest.main()
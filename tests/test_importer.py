@@ -0,0 +1,64 @@
+"""
+Import of timesheets into schedule stores.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import mhcalendar.holiday as holiday_index
+import mhcalendar.io as io
+from mhcalendar import daemon, importer
+from mhcalendar.store import ScheduleStore
+
+
+def rows(worker):
+    return [{'date': '2017-10-02', 'hours': '8', 'worker': worker},
+            {'date': '2017-10-03', 'hours': '9.5', 'worker': worker}]
+
+
+class ImportTest(unittest.TestCase):
+    def setUp(self):
+        self.__config_dir = io.CONFIG_DIR
+        self.__temp = tempfile.TemporaryDirectory()
+        io.CONFIG_DIR = os.path.join(self.__temp.name, 'config')
+        self.root = os.path.join(self.__temp.name, 'stores')
+        os.makedirs(io.CONFIG_DIR)
+        holiday_index.load([])
+
+    def tearDown(self):
+        io.CONFIG_DIR = self.__config_dir
+        holiday_index.invalidate()
+        self.__temp.cleanup()
+
+    def test_import_by_worker(self):
+        self.assertEqual(importer.import_timesheet(rows('alice'), self.root), 2)
+        days = ScheduleStore(os.path.join(self.root, 'alice')).load_month(2017, 10).days
+        self.assertEqual((days[1].checkin_manhour, days[2].checkin_manhour), (8.0, 9.5))
+
+    def test_worker_names_out_of_root(self):
+        for name in ('..', '../x', 'a/b', '/etc/x', '.'):
+            with self.assertRaises(ValueError, msg=name):
+                importer.import_timesheet(rows(name), self.root)
+        self.assertFalse(os.path.exists(os.path.join(self.__temp.name, 'x')))
+
+    def test_own_schedule(self):
+        self.assertEqual(importer.import_timesheet(rows('ignored')), 2)
+        month = io.Cache.schedule_store().load_month(2017, 10)
+        self.assertEqual(month.days[1].checkin_manhour, 8.0)
+
+    def test_own_schedule_while_daemon_is_running(self):
+        with mock.patch.object(daemon, 'running', return_value=True):
+            with self.assertRaises(Exception):
+                importer.import_timesheet(rows(''))
+        self.assertIsNone(io.Cache.schedule_store().load_month(2017, 10))
+
+    def test_own_schedule_while_daemon_is_not_answering(self):
+        with mock.patch.object(daemon, 'request', side_effect=daemon.DaemonError('timed out')):
+            with self.assertRaises(daemon.DaemonError):
+                importer.import_timesheet(rows(''))
+        self.assertIsNone(io.Cache.schedule_store().load_month(2017, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
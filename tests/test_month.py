@@ -0,0 +1,124 @@
+"""
+Running totals of Month must always equal the totals recomputed from all days.
+"""
+import random
+import unittest
+from contextlib import redirect_stdout
+from decimal import Decimal
+from io import StringIO
+
+from mhcalendar.job import Job
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+HOURS = (0, 4, 7.5, 8, 9.25, 10)
+
+
+def recompute(month):
+    """
+    :return: totals of the month figured out from every day, as Month did before it kept running totals
+    """
+    past = [day for day in month.days if day.is_past]
+    remain = [day for day in month.days if not day.is_past]
+    return {
+        'past_checkin': sum((dec_float(day.checkin_manhour) for day in past), Decimal(0)),
+        'past_overtime': sum((dec_float(day.overtime) for day in past), Decimal(0)),
+        'past_count': len(past),
+        'past_workday_count': len([day for day in past if not day.is_dayoff]),
+        'workdays_remain': [day.date for day in remain if not day.is_dayoff],
+        'dayoff_remain': [day.date for day in remain if day.is_dayoff],
+        'next_day': remain[0].date if remain else None,
+    }
+
+
+def running(month):
+    """
+    :return: the same totals as recompute(), taken from the running totals of the month
+    """
+    next_day = month.next_day
+    return {
+        'past_checkin': month.past_checkin,
+        'past_overtime': month.past_overtime,
+        'past_count': month.past_count,
+        'past_workday_count': month.past_workday_count,
+        'workdays_remain': [day.date for day in month.workdays_remain],
+        'dayoff_remain': [day.date for day in month.dayoff_remain],
+        'next_day': next_day.date if next_day else None,
+    }
+
+
+def random_step(rnd, schedule):
+    """
+    Change the schedule in one of the ways the commands do.
+
+    :return: description of the step
+    """
+    month = schedule.month
+    day = rnd.choice(month.days)
+    step = rnd.randrange(7)
+    if step == 0 and month.next_day:
+        hours = rnd.choice(HOURS)
+        month.next_day.checkin(hours)
+        return 'checkin next day {}'.format(hours)
+    if step == 1:
+        past = rnd.random() < 0.8
+        day.checkin(rnd.choice(HOURS), past)
+        return 'checkin {0} past={1}'.format(day.date, past)
+    if step == 2 and not day.is_past:
+        day.dayoff()
+        return 'dayoff {}'.format(day.date)
+    if step == 3 and not day.is_past:
+        day.onduty()
+        return 'onduty {}'.format(day.date)
+    if step == 4:
+        dates = [rnd.choice((1, -1)) * rnd.randint(1, len(month.days)) for _ in range(3)]
+        with redirect_stdout(StringIO()):
+            schedule.adjust(day_off=dates)
+        return 'adjust {}'.format(dates)
+    if step == 5:
+        precision = rnd.choice((0, 0.25, 0.5, 1))
+        schedule.schedule(precision)
+        return 'schedule {}'.format(precision)
+    # change attributes directly, which needs refresh()
+    day.is_past = not day.is_past
+    day.checkin_manhour = rnd.choice(HOURS)
+    day.overtime = rnd.choice(HOURS) - 8
+    month.refresh()
+    return 'refresh after changing {}'.format(day.date)
+
+
+class RunningTotalsTest(unittest.TestCase):
+    def test_totals_equal_full_recompute_after_every_step(self):
+        rnd = random.Random(20171007)
+        for case in range(300):
+            job = Job(rnd.choice((120, 160, 180.5)), rnd.choice((7.5, 8)), 2000, rnd.choice((0, 2)))
+            schedule = Schedule(job, Month(rnd.randint(2000, 2030), rnd.randint(1, 12), []))
+            steps = []
+            for _ in range(rnd.randint(1, 60)):
+                steps.append(random_step(rnd, schedule))
+                expected = recompute(schedule.month)
+                self.assertEqual(running(schedule.month), expected, (case, steps))
+                # same digits as the sum of all days, which is what the drawer prints
+                self.assertEqual(str(schedule.month.past_checkin), str(expected['past_checkin']), (case, steps))
+                self.assertEqual(str(schedule.month.past_overtime), str(expected['past_overtime']),
+                                 (case, steps))
+
+    def test_schedule_totals_equal_full_recompute(self):
+        rnd = random.Random(20171008)
+        for _ in range(200):
+            job = Job(rnd.choice((120, 160, 180.5)), 8, 2000, 2)
+            schedule = Schedule(job, Month(2017, rnd.randint(1, 12), []))
+            for _ in range(rnd.randint(0, 25)):
+                random_step(rnd, schedule)
+            schedule.schedule()
+            expected = recompute(schedule.month)
+            if expected['past_count']:
+                self.assertEqual(schedule.checkin_manhour, expected['past_checkin'])
+                self.assertEqual(schedule.overhours, expected['past_overtime'])
+            else:
+                self.assertEqual((schedule.checkin_manhour, schedule.overhours), (0, 0))
+            remain = dec_float(job.required_manhour) - expected['past_checkin']
+            self.assertEqual(schedule.manhour_remain, remain if remain > 0 else 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+What-if scenarios of a schedule, against adjusting and scheduling the schedule itself.
+"""
+import unittest
+from contextlib import redirect_stdout
+from decimal import Decimal
+from io import StringIO
+
+import mhcalendar.holiday as holiday_index
+from mhcalendar.holiday import JapaneseHolidays
+from mhcalendar.job import Job
+from mhcalendar.simulate import Scenario, Summary, simulate, summarize
+from mhcalendar.time_elements import Month, Schedule, dec_float
+
+SCENARIOS = [
+    Scenario('base'),
+    Scenario('three days off', (13, 14, 15), 0.25),
+    Scenario('work on saturday', (-18,), 0.5),
+    Scenario('all at once', (20, 21, -25), 0),
+]
+
+
+def may_2024():
+    """
+    :return: Schedule of 2024.5 checked in from the 1st to the 7th, which has 21 workdays
+    """
+    with redirect_stdout(StringIO()):
+        schedule = Schedule(Job(160, 8, 2000, 2), Month(2024, 5))
+    schedule.schedule()
+    for day in schedule.month.days[:7]:
+        day.checkin(0 if day.is_dayoff else 9)
+    return schedule
+
+
+def expected(scenario):
+    """
+    :return: Summary of the scenario figured out from every day of a schedule adjusted and scheduled in place
+    """
+    schedule = may_2024()
+    with redirect_stdout(StringIO()):
+        schedule.adjust(day_off=scenario.day_off)
+    schedule.schedule(scenario.precision)
+    days = schedule.month.days
+    hours = sum((dec_float(day.checkin_manhour if day.is_past else day.scheduled_work_hours) for day in days),
+                Decimal(0))
+    return Summary(scenario.name, len([day for day in days if not day.is_dayoff]),
+                   sum((dec_float(day.overtime) for day in days), Decimal(0)), schedule.manhour_absence,
+                   hours * dec_float(schedule.job.hourly_pay))
+
+
+class SimulateTest(unittest.TestCase):
+    def setUp(self):
+        holiday_index.load(JapaneseHolidays().holidays(2024, 2024))
+
+    def tearDown(self):
+        holiday_index.invalidate()
+
+    def test_past_days_off_are_not_workdays(self):
+        schedule = may_2024()
+        self.assertEqual(summarize('base', schedule).workdays, 21)
+
+    def test_scenarios_equal_adjusting_the_schedule(self):
+        schedule = may_2024()
+        self.assertEqual(simulate(schedule, SCENARIOS), [expected(scenario) for scenario in SCENARIOS])
+
+    def test_schedule_is_not_touched(self):
+        schedule = may_2024()
+        before = [(day.is_dayoff, day.scheduled_work_hours, day.overtime) for day in schedule.month.days]
+        simulate(schedule, SCENARIOS)
+        self.assertEqual([(day.is_dayoff, day.scheduled_work_hours, day.overtime) for day in schedule.month.days],
+                         before)
+
+    def test_pool_equals_in_process(self):
+        schedule = may_2024()
+        self.assertEqual(simulate(schedule, SCENARIOS, processes=2), simulate(schedule, SCENARIOS))
+
+
+if __name__ == '__main__':
+    unittest.main()
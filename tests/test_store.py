@@ -0,0 +1,130 @@
+"""
+Output of the commands must not change after the schedule goes through the store or the migration of old caches.
+"""
+import os
+import pickle
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import mhcalendar.holiday as holiday_index
+import mhcalendar.io as io
+from mhcalendar import commands
+from mhcalendar.job import Job
+from mhcalendar.store import HEAD, HEAD_V1, write_atomic
+from mhcalendar.time_elements import Month, Schedule
+
+# the same commands as a user would run one by one, with the arguments given by the command line
+SESSION = [
+    ('set_job', {'required_manhour': '160', 'daily_work_hours': '8', 'hourly_pay': '2000',
+                 'max_daily_overhours': '2'}),
+    ('show_job', {}),
+    ('checkin', {'hours': None}),
+    ('pointer', {}),
+    ('calendar', {'precision': 1}),
+    ('checkin', {'hours': None}),
+    ('checkin', {'hours': '9.5'}),
+    ('checkin', {'hours': None}),
+    ('dayoff', {'dates': ['20', '21']}),
+    ('calendar', {'precision': 0.5}),
+    ('pointer', {}),
+    ('checkin', {'hours': None}),
+    ('dayoff', {'dates': ['-21']}),
+    ('calendar', {'precision': 0}),
+    ('show_job', {}),
+]
+
+
+def run(schedule, command, args):
+    output = StringIO()
+    with redirect_stdout(output):
+        result = getattr(commands, command)(schedule, **args)
+    return output.getvalue(), result
+
+
+class RoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.__config_dir = io.CONFIG_DIR
+        self.__temp = tempfile.TemporaryDirectory()
+        io.CONFIG_DIR = self.__temp.name
+        holiday_index.load([])
+
+    def tearDown(self):
+        io.CONFIG_DIR = self.__config_dir
+        holiday_index.invalidate()
+        self.__temp.cleanup()
+
+    def in_memory(self):
+        """
+        :return: output of the session on one schedule in memory, which never goes through the store
+        """
+        schedule = Schedule(None, Month(2017, 10))
+        return [run(schedule, command, args)[0] for command, args in SESSION]
+
+    def test_store(self):
+        """
+        Each command works on the schedule restored from the store, as the command line does.
+        """
+        io.Cache.cache_schedule(Schedule(None, Month(2017, 10)))
+        outputs = []
+        for command, args in SESSION:
+            schedule = io.Cache.restore_schedule()
+            output, result = run(schedule, command, args)
+            outputs.append(output)
+            if command == 'checkin':
+                io.Cache.cache_day(schedule, result)
+            else:
+                io.Cache.cache_schedule(schedule)
+        self.assertEqual(outputs, self.in_memory())
+
+    def test_migrate(self):
+        """
+        Each command works on the schedule migrated from the pickle cache of old versions.
+        """
+        store = io.Cache.schedule_store()
+        schedule = Schedule(None, Month(2017, 10))
+        outputs = []
+        for command, args in SESSION:
+            with open(os.path.join(io.CONFIG_DIR, io.Cache.SCHEDULE_CACHE_NAME), 'wb') as file:
+                pickle.dump(schedule, file)
+            # migration only happens while the store is empty
+            if store.exists():
+                os.remove(store.head_path)
+            schedule = io.Cache.restore_schedule()
+            output, _ = run(schedule, command, args)
+            outputs.append(output)
+        self.assertEqual(outputs, self.in_memory())
+
+    def test_numbers_keep_type(self):
+        schedule = Schedule(None, Month(2017, 10))
+        days = schedule.month.days
+        days[0].checkin(0)
+        days[1].checkin(7.5)
+        days[2].checkin(8)
+        schedule.manhour_absence = 0
+        store = io.Cache.schedule_store()
+        store.save(schedule)
+        restored = store.load().month.days
+        for day, other in zip(days, restored):
+            for name in ('scheduled_work_hours', 'checkin_manhour', 'overtime'):
+                self.assertIs(type(getattr(other, name)), type(getattr(day, name)))
+                self.assertEqual(getattr(other, name), getattr(day, name))
+        self.assertIs(type(store.load().manhour_absence), int)
+
+    def test_head_of_version_1(self):
+        schedule = Schedule(Job(160.0, 8.0, 2000.0, 2.0), Month(2017, 10))
+        schedule.manhour_absence = 1.5
+        store = io.Cache.schedule_store()
+        store.save(schedule)
+        with open(store.head_path, 'rb') as file:
+            fields = list(HEAD.unpack(file.read()))
+        fields[1] = 1
+        write_atomic(store.head_path, HEAD_V1.pack(*fields[:-1]))
+        restored = store.load()
+        self.assertEqual(str(restored.job), str(schedule.job))
+        self.assertEqual((restored.manhour_absence, restored.manhour_carried), (1.5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Timeline of one job across many months.
+"""
+import tempfile
+import unittest
+from decimal import Decimal
+
+import mhcalendar.holiday as holiday_index
+from mhcalendar.job import Job
+from mhcalendar.store import ScheduleStore
+from mhcalendar.timeline import Timeline
+
+# more hours than any month can take, so that every month has absence
+JOB = Job(300, 8, 2000, 2)
+
+
+class TimelineTest(unittest.TestCase):
+    def setUp(self):
+        holiday_index.load([])
+
+    def tearDown(self):
+        holiday_index.invalidate()
+
+    def test_total_absence_without_carry_is_the_sum_of_months(self):
+        timeline = Timeline(JOB, (2026, 1), carry_absence=False)
+        absences = [Decimal(str(timeline.summary(2026, month).manhour_absence)) for month in (1, 2, 3)]
+        self.assertTrue(all(absences))
+        self.assertEqual(timeline.quarter(2026, 1).manhour_absence, sum(absences))
+
+    def test_total_absence_with_carry_is_left_in_the_last_month(self):
+        timeline = Timeline(JOB, (2026, 1))
+        self.assertEqual(timeline.quarter(2026, 1).manhour_absence,
+                         Decimal(str(timeline.summary(2026, 3).manhour_absence)))
+        self.assertEqual(timeline.summary(2026, 2).manhour_carried, timeline.summary(2026, 1).manhour_absence)
+
+    def test_save_without_store(self):
+        timeline = Timeline(JOB, (2026, 1))
+        timeline.summary(2026, 1)
+        with self.assertRaises(ValueError):
+            timeline.save()
+
+    def test_carried_hours_survive_reload(self):
+        with tempfile.TemporaryDirectory() as root:
+            timeline = Timeline(JOB, (2026, 1), ScheduleStore(root))
+            carried = timeline.summary(2026, 2).manhour_carried
+            self.assertTrue(carried)
+            timeline.save()
+
+            self.assertEqual(ScheduleStore(root).load().manhour_carried, carried)
+            reloaded = Timeline(JOB, (2026, 2), ScheduleStore(root))
+            self.assertEqual(reloaded.summary(2026, 2), timeline.summary(2026, 2))
+
+    def test_carried_into_start_survive_reopen(self):
+        with tempfile.TemporaryDirectory() as root:
+            timeline = Timeline(JOB, (2026, 1), ScheduleStore(root), carried=10)
+            quarter = timeline.quarter(2026, 1)
+            timeline.save()
+            self.assertEqual(ScheduleStore(root).load().month.index['month'], 3)
+
+            reopened = Timeline(JOB, (2026, 1), ScheduleStore(root))
+            self.assertEqual(reopened.carried, 10)
+            self.assertIsInstance(reopened.carried, int)
+            self.assertEqual(reopened.quarter(2026, 1), quarter)
+
+
+if __name__ == '__main__':
+    unittest.main()